@@ -0,0 +1,58 @@
+# Streamlit helpers shared by the apps. statcore stays headless, so anything
+# that touches streamlit lives here instead.
+import os
+import time
+
+import streamlit as st
+
+from statcore.cache import default_cache
+from statcore.ingest import EXTENSIONS, spool_to_disk
+from statcore.profiling import default_recorder
+
+# Seconds between reruns while a background task is still running
+POLL_INTERVAL = 0.2
+
+
+def uploaded_path(label):
+    # Uploads are spooled to a content-addressed file so they can be memory-mapped.
+    # The path is kept in session_state per upload, so reruns (every
+    # POLL_INTERVAL while a task is pending) neither copy nor rehash the bytes.
+    upload = st.file_uploader(label, type=sorted({ext.lstrip('.') for ext in EXTENSIONS}))
+    if upload is None:
+        return None
+    key = f'uploaded_path:{label}'
+    file_id, path = st.session_state.get(key, (None, None))
+    if file_id != upload.file_id or not os.path.exists(path):
+        path = spool_to_disk(upload.name, upload.getvalue())
+        st.session_state[key] = (upload.file_id, path)
+    return path
+
+
+def column_pair(numeric):
+    # x and y column pickers; None (with an error shown) when both are the same
+    x_column = st.selectbox('x column', numeric)
+    y_column = st.selectbox('y column', numeric, index=1)
+    if x_column == y_column:
+        st.error('Pick two different columns for x and y')
+        return None
+    return x_column, y_column
+
+
+def show_diagnostics(executor=None):
+    with st.expander('Cache statistics'):
+        st.write(default_cache.stats())
+        if executor is not None:
+            st.write(executor.stats())
+
+    # Latencies are recorded only when profiling is enabled (STATCORE_PROFILE=1)
+    if default_recorder.enabled:
+        with st.expander('Latency profile'):
+            st.write(default_recorder.summary())
+
+
+def rerun_while_pending(tasks):
+    # The script never waits on a computation; it reruns until the tasks
+    # finish, and any widget change interrupts the wait
+    if any(task is not None and not task.done() for task in tasks):
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
@@ -0,0 +1,190 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from statcore.distance import calculate_distance
+from statcore.fast_kde import KDE_ROW_THRESHOLD, make_kde
+from statcore.hypothesis import perform_t_test, perform_z_test
+from statcore.normalization import normalize_data
+from statcore.pairwise import pairwise_distances
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+FULL_SIZES = SIZES + [10_000_000]
+DIMS = [2, 8, 64, 256, 1024]
+
+# The batched distance case compares PAIRWISE_QUERIES rows against n points;
+# (n, dim) cells whose inputs and output exceed GRID_MAX_ELEMENTS are skipped
+PAIRWISE_QUERIES = 16
+GRID_MAX_ELEMENTS = 1 << 28
+
+
+def setup_distance(rng, n, dim):
+    return rng.normal(size=dim), rng.normal(size=dim)
+
+
+def setup_pairwise(rng, n, dim):
+    return rng.normal(size=(PAIRWISE_QUERIES, dim)), rng.normal(size=(n, dim))
+
+
+def setup_sparse(rng, n, dim):
+    # 500 rows with at most 32 non-zeros each, so cost should not track dim
+    import scipy.sparse as sp
+
+    density = min(1.0, 32 / dim)
+    return (sp.random_array((500, dim), density=density, rng=rng, format='csr'),
+            sp.random_array((100, dim), density=density, rng=rng, format='csr'))
+
+
+def setup_normalize(rng, n, dim):
+    import pandas as pd
+
+    return (pd.DataFrame({'x': rng.normal(50, 10, n), 'y': rng.normal(100, 20, n)}),)
+
+
+def setup_samples(rng, n, dim):
+    return rng.normal(0.0, 1.0, n), rng.normal(0.1, 1.0, n)
+
+
+def kde_evaluation(values):
+    # What plot_data does per column: fit, then evaluate a 200-point curve
+    kde = make_kde(values, KDE_ROW_THRESHOLD)
+    return kde(np.linspace(values.min(), values.max(), 200))
+
+
+# name -> (swept parameter, setup(rng, n, dim) -> args, function)
+CASES = {
+    'calculate_distance': ('dim', setup_distance, lambda p1, p2: calculate_distance(p1, p2, 'Euclidean')),
+    'pairwise_distances': ('n x dim', setup_pairwise, lambda q, x: pairwise_distances(q, x, 'Euclidean')),
+    'sparse_pairwise': ('dim', setup_sparse, pairwise_distances),
+    'normalize_data': ('n', setup_normalize, normalize_data),
+    'kde_evaluation': ('n', lambda rng, n, dim: (rng.normal(size=n),), kde_evaluation),
+    'perform_t_test': ('n', setup_samples, perform_t_test),
+    'perform_z_test': ('n', setup_samples, perform_z_test),
+}
+
+
+def time_call(func, args, repeats):
+    timer = timeit.Timer(lambda: func(*args))
+    loops, _ = timer.autorange()
+    per_call = [t / loops for t in timer.repeat(repeats, loops)]
+    return {'median_s': statistics.median(per_call), 'min_s': min(per_call), 'loops': loops}
+
+
+def trace_call(func, args):
+    # Separate from timing because tracemalloc slows allocation-heavy code.
+    # Peak is the high-water mark of traced memory during the call; retained
+    # blocks/bytes are what the call left allocated afterwards.
+    func(*args)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    diff = after.compare_to(before, 'filename')
+    return {'peak_bytes': peak, 'retained_blocks': sum(d.count_diff for d in diff),
+            'retained_bytes': sum(d.size_diff for d in diff)}
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'timestamp': datetime.datetime.now().isoformat(timespec='seconds')}
+
+
+def case_grid(swept, sizes, dims):
+    if swept == 'dim':
+        return [(1, dim) for dim in dims]
+    if swept == 'n':
+        return [(n, None) for n in sizes]
+    return [(n, dim) for n in sizes for dim in dims if n * (dim + PAIRWISE_QUERIES) <= GRID_MAX_ELEMENTS]
+
+
+def run(cases, sizes, dims, repeats, seed):
+    rng = np.random.default_rng(seed)
+    results = []
+    print(f"{'case':<20}{'n':>10}{'dim':>6}{'median':>12}{'min':>12}{'peak MiB':>10}{'blocks':>8}")
+    for name in cases:
+        swept, setup, func = CASES[name]
+        for n, dim in case_grid(swept, sizes, dims):
+            args = setup(rng, n, dim)
+            row = {'case': name, 'n': n, 'dim': dim, **time_call(func, args, repeats), **trace_call(func, args)}
+            results.append(row)
+            print(f"{name:<20}{n:>10}{dim or '-':>6}{_format_time(row['median_s']):>12}"
+                  f"{_format_time(row['min_s']):>12}{row['peak_bytes'] / 2 ** 20:>10.2f}{row['retained_blocks']:>8}")
+    return {'meta': metadata(), 'results': results}
+
+
+def _format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def _key(row):
+    return (row['case'], row['n'], row['dim'])
+
+
+def compare(current, baseline, time_threshold, memory_threshold):
+    # A case regresses when its min time or peak memory grows by more than the
+    # threshold fraction; min time is the least noisy estimate of the cost
+    previous = {_key(row): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        old = previous.get(_key(row))
+        if old is None:
+            continue
+        time_ratio = row['min_s'] / old['min_s']
+        memory_ratio = (row['peak_bytes'] + 1) / (old['peak_bytes'] + 1)
+        if time_ratio > 1 + time_threshold:
+            regressions.append(f"{row['case']} n={row['n']} dim={row['dim']}: time x{time_ratio:.2f}")
+        if memory_ratio > 1 + memory_threshold:
+            regressions.append(f"{row['case']} n={row['n']} dim={row['dim']}: peak memory x{memory_ratio:.2f}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time and trace memory of the statcore hot paths')
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, help='Row counts (default 1e2..1e6)')
+    parser.add_argument('--full', action='store_true', help='Extend the default sizes to 1e7 rows')
+    parser.add_argument('--dims', nargs='+', type=int, default=DIMS)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--compare', help='Baseline JSON from an earlier run (e.g. another commit)')
+    parser.add_argument('--time-threshold', type=float, default=0.25)
+    parser.add_argument('--memory-threshold', type=float, default=0.10)
+    args = parser.parse_args()
+
+    sizes = args.sizes or (FULL_SIZES if args.full else SIZES)
+    current = run(args.cases, sizes, args.dims, args.repeats, args.seed)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.time_threshold, args.memory_threshold)
+        print(f"Compared with {baseline['meta'].get('commit') or args.compare}: "
+              f"{len(regressions)} regression(s)")
+        if regressions:
+            sys.exit('\n'.join(regressions))
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules a headless batch job must never pay for
+UI_MODULES = ['streamlit', 'plotly', 'matplotlib']
+HEAVY_MODULES = UI_MODULES + ['sklearn', 'statsmodels', 'scipy', 'pandas']
+
+TARGETS = {
+    'numpy': 'import numpy',
+    'statcore': 'import statcore',
+    'statcore.distance': 'from statcore import calculate_distance',
+    'statcore.normalization': 'from statcore import normalize_data',
+    'statcore.hypothesis': 'from statcore import perform_t_test, perform_z_test',
+    'statcore.batch_tests': 'import statcore.batch_tests',
+    'statcore.fast_pvalue': 'import statcore.fast_pvalue',
+    'statcore.streaming_scaler': 'import statcore.streaming_scaler',
+}
+
+PROBE = '''
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+import json
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def measure(statement, repeats):
+    # Each run is a fresh interpreter, so every import is cold
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    times, loaded = [], []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+                                text=True, check=True)
+        sample = json.loads(result.stdout)
+        times.append(sample['seconds'])
+        loaded = sample['loaded']
+    return {'median_ms': 1000 * statistics.median(times), 'min_ms': 1000 * min(times), 'loaded': loaded}
+
+
+def run(repeats):
+    results = {name: measure(statement, repeats) for name, statement in TARGETS.items()}
+    print(f"{'target':<28}{'median ms':>12}{'min ms':>10}  heavy modules loaded")
+    for name, r in results.items():
+        print(f"{name:<28}{r['median_ms']:>12.1f}{r['min_ms']:>10.1f}  {', '.join(r['loaded']) or '-'}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure cold-import cost of the headless core')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+    results = run(args.repeats)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    leaked = sorted({m for r in results.values() for m in r['loaded'] if m in UI_MODULES})
+    if leaked:
+        sys.exit(f"UI modules loaded by the headless core: {', '.join(leaked)}")
@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+FORMATS = ['csv', 'parquet', 'arrow', 'npy']
+
+
+def write_files(directory, n_rows, n_columns, seed):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({f'c{i}': rng.normal(size=n_rows) for i in range(n_columns)})
+    frame['group'] = rng.choice(['a', 'b', 'c', 'd'], n_rows)
+    paths = {fmt: os.path.join(directory, f'data.{fmt}') for fmt in FORMATS}
+    frame.to_csv(paths['csv'], index=False)
+    frame.to_parquet(paths['parquet'], row_group_size=100_000)
+    # One uncompressed record batch keeps the zero-copy path available
+    feather.write_feather(pa.Table.from_pandas(frame, preserve_index=False), paths['arrow'],
+                          compression='uncompressed', chunksize=n_rows)
+    np.save(paths['npy'], frame.drop(columns='group').to_numpy())
+    return paths
+
+
+def _peak_rss_bytes():
+    # VmHWM is per address space; ru_maxrss can carry over the parent's peak
+    # across fork/exec, which hides anything smaller than the data writer
+    try:
+        with open('/proc/self/status') as f:
+            return next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmHWM'))
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def probe(method, fmt, path, columns, filtered):
+    # Runs in a fresh interpreter: load, then touch every value as a consumer
+    # would, and report wall time and the growth of peak resident memory
+    import pandas as pd
+    import pyarrow  # noqa: F401 - imported up front so only the read is measured
+    from statcore.ingest import read_columns
+
+    if fmt == 'npy':
+        names = [str(int(c[1:])) for c in columns]
+        filters = [('0', '>', 0.0)] if filtered else None
+    else:
+        names = columns
+        filters = [('group', '==', 'a')] if filtered else None
+
+    baseline = _peak_rss_bytes()
+    start = time.perf_counter()
+    if method == 'ingest':
+        arrays = list(read_columns(path, names, filters).values())
+    else:
+        if fmt == 'csv':
+            frame = pd.read_csv(path)
+        elif fmt == 'parquet':
+            frame = pd.read_parquet(path)
+        elif fmt == 'arrow':
+            frame = pd.read_feather(path)
+        else:
+            frame = pd.DataFrame(np.load(path)).rename(columns=str)
+        if filtered:
+            frame = frame[frame['group'] == 'a'] if fmt != 'npy' else frame[frame['0'] > 0.0]
+        arrays = [frame[name].to_numpy() for name in names]
+    total = sum(float(np.sum(a)) for a in arrays)
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'rss_bytes': _peak_rss_bytes() - baseline, 'rows': int(arrays[0].size),
+            'checksum': total}
+
+
+def measure(method, fmt, path, columns, filtered, repeats):
+    spec = json.dumps([method, fmt, path, columns, filtered])
+    samples = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), '--probe', spec], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        samples.append(json.loads(result.stdout))
+    return {'median_s': statistics.median(s['seconds'] for s in samples),
+            'rss_mib': statistics.median(s['rss_bytes'] for s in samples) / 2 ** 20,
+            'rows': samples[0]['rows']}
+
+
+def run(n_rows, n_columns, n_selected, repeats, seed, directory):
+    paths = write_files(directory, n_rows, n_columns, seed)
+    columns = [f'c{i}' for i in range(n_selected)]
+    print(f"rows={n_rows} columns={n_columns} selected={n_selected} "
+          f"(page cache is warm after the first read of each file)")
+    print(f"{'format':<9}{'filter':<8}{'method':<8}{'median s':>10}{'peak RSS MiB':>14}{'rows':>10}")
+    results = []
+    for fmt in FORMATS:
+        for filtered in (False, True):
+            for method in ('pandas', 'ingest'):
+                row = measure(method, fmt, paths[fmt], columns, filtered, repeats)
+                row.update(format=fmt, filtered=filtered, method=method)
+                results.append(row)
+                print(f"{fmt:<9}{'yes' if filtered else 'no':<8}{method:<8}{row['median_s']:>10.3f}"
+                      f"{row['rss_mib']:>14.1f}{row['rows']:>10}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare statcore.ingest with plain pandas reads')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--columns', type=int, default=16, help='Numeric columns in the file')
+    parser.add_argument('--select', type=int, default=2, help='Columns actually needed')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dir', help='Where to write the test files (default: a temporary directory)')
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--probe', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        print(json.dumps(probe(*json.loads(args.probe))))
+        sys.exit()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args.rows, args.columns, args.select, args.repeats, args.seed, args.dir or tmp)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,60 @@
+import argparse
+import time
+
+import numpy as np
+
+from statcore.distance import calculate_distance
+from statcore.knn_index import KNNIndex, brute_force_knn, recall_at_k
+
+
+def scan_calculate_distance(points, query, metric):
+    # What a caller looping over calculate_distance does: one pair per call
+    distances = [calculate_distance(query, x, metric)[0] for x in points]
+    return int(np.argmin(distances))
+
+
+def run(n_points, n_queries, dim, k, metric, seed):
+    rng = np.random.default_rng(seed)
+    points = rng.normal(size=(n_points, dim))
+    queries = rng.normal(size=(n_queries, dim))
+    rows = []
+
+    scan_queries = queries[:max(1, min(n_queries, 2_000_000 // (n_points * 20) or 1))]
+    start = time.perf_counter()
+    for q in scan_queries:
+        scan_calculate_distance(points, q, metric)
+    elapsed = time.perf_counter() - start
+    rows.append(('calculate_distance scan', len(scan_queries) / elapsed, 1.0, 0.0))
+
+    start = time.perf_counter()
+    brute_force_knn(points, queries, k, metric)
+    elapsed = time.perf_counter() - start
+    rows.append(('pairwise brute force', n_queries / elapsed, 1.0, 0.0))
+
+    # Warm up the lazily imported tree backend so it is not counted as build time
+    KNNIndex(metric).build(points[:10])
+    for mode in ('exact', 'approximate'):
+        start = time.perf_counter()
+        index = KNNIndex(metric, mode=mode, seed=seed).build(points)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        index.query(queries, k)
+        elapsed = time.perf_counter() - start
+        rows.append((f'KNNIndex {mode}', n_queries / elapsed, recall_at_k(index, queries, k), build))
+
+    print(f"n_points={n_points} n_queries={n_queries} dim={dim} k={k} metric={metric}")
+    print(f"{'method':<26}{'queries/s':>14}{'recall':>10}{'build s':>10}")
+    for name, qps, recall, build in rows:
+        print(f"{name:<26}{qps:>14.1f}{recall:>10.3f}{build:>10.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare k-NN index throughput with scanning')
+    parser.add_argument('--points', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=1_000)
+    parser.add_argument('--dim', type=int, default=8)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--metric', default='Euclidean', choices=['Euclidean', 'Manhattan', 'Chebyshev'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.points, args.queries, args.dim, args.k, args.metric, args.seed)
@@ -0,0 +1,113 @@
+import argparse
+import statistics
+import sys
+import timeit
+
+import numpy as np
+
+from statcore import fast_pvalue
+from statcore.fast_pvalue import TABLE_MIN_SF, pvalue, t_cdf, t_sf
+
+
+def _errors(approx, exact):
+    # Max absolute error, and max relative error on the tail side (exact at
+    # most 0.5), over the range the tables cover. On the other side the value
+    # is 1 - tail, whose relative precision double arithmetic cannot keep.
+    covered = np.minimum(exact, 1 - exact) >= TABLE_MIN_SF
+    tail = covered & (exact <= 0.5)
+    relative = np.abs(approx[tail] - exact[tail]) / exact[tail]
+    return float(np.max(np.abs(approx[covered] - exact[covered]))), float(np.max(relative))
+
+
+def statistic_grid(n, scale):
+    # Dense in the centre, geometric out to well past the table range
+    rng = np.random.default_rng(0)
+    x = np.concatenate([np.linspace(-10, 10, n), np.geomspace(1e-6, scale, n), rng.standard_t(2, n)])
+    return np.concatenate([x, -x])
+
+
+def check_accuracy(n, n_df):
+    from scipy import special
+
+    failures = []
+    x = statistic_grid(n, 1e40)
+    rows = []
+    dfs = np.concatenate([np.arange(1, 40), np.geomspace(fast_pvalue.DF_MIN, 1e7, n_df),
+                          np.random.default_rng(1).uniform(1, 200, n_df)])
+    bounds = {'t sf': fast_pvalue.T_ABS_ERROR, 't cdf': fast_pvalue.T_ABS_ERROR,
+              't two-sided pvalue': fast_pvalue.PVALUE_ABS_ERROR}
+    worst = {name: [0.0, 0.0] for name in bounds}
+    for df in dfs:
+        for name, approx, exact in (('t sf', t_sf(x, df), special.stdtr(df, -x)),
+                                    ('t cdf', t_cdf(x, df), special.stdtr(df, x)),
+                                    ('t two-sided pvalue', pvalue(x, df), 2 * special.stdtr(df, -np.abs(x)))):
+            abs_err, rel_err = _errors(approx, exact)
+            worst[name] = [max(worst[name][0], abs_err), max(worst[name][1], rel_err)]
+    rows += [(name, None, None, bounds[name], fast_pvalue.T_REL_ERROR) for name in worst]
+
+    # Per-element df goes through the blended path rather than _t_blended
+    rng = np.random.default_rng(2)
+    welch_x = rng.choice(x, 100 * n)
+    welch_df = np.exp(rng.uniform(0, np.log(1e7), welch_x.size))
+    rows.append(('t sf, array df', t_sf(welch_x, welch_df), special.stdtr(welch_df, -welch_x),
+                 fast_pvalue.T_ABS_ERROR, fast_pvalue.T_REL_ERROR))
+
+    print(f"{'function':<22}{'max abs':>12}{'bound':>10}{'max rel':>12}{'bound':>10}")
+    for name, approx, exact, abs_bound, rel_bound in rows:
+        abs_err, rel_err = worst[name] if approx is None else _errors(approx, exact)
+        print(f"{name:<22}{abs_err:>12.2e}{abs_bound:>10.0e}{rel_err:>12.2e}{rel_bound:>10.0e}")
+        if abs_err > abs_bound or rel_err > rel_bound:
+            failures.append(name)
+
+    # Past the tables stdtr takes over, so relative precision holds
+    deep_errors = []
+    for df in (1, 30, 1e4, 1e9):
+        deep = -special.stdtrit(df, TABLE_MIN_SF / 10) * np.geomspace(1, 1e20, 200)
+        exact = special.stdtr(df, -deep)
+        approx = t_sf(deep, df)
+        deep_errors.append(np.max(np.abs(approx - exact) / np.where(exact > 0, exact, 1)))
+    print(f"extreme tails: max relative error {max(deep_errors):.1e}")
+    if max(deep_errors) > 1e-14:
+        failures.append('extreme tails')
+    return failures
+
+
+def time_call(func, repeats):
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    return statistics.median(t / loops for t in timer.repeat(repeats, loops))
+
+
+def check_speed(sizes, repeats):
+    from scipy import stats
+
+    rng = np.random.default_rng(2)
+    print(f"{'case':<28}{'n':>10}{'scipy':>12}{'fast':>12}{'speedup':>9}")
+    for n in sizes:
+        z = rng.normal(size=n)
+        welch_df = rng.uniform(5, 500, n)
+        cases = [
+            ('z two-sided', lambda: 2 * stats.norm.sf(np.abs(z)), lambda: pvalue(z)),
+            ('t two-sided, df=28', lambda: 2 * stats.t(28).sf(np.abs(z)), lambda: pvalue(z, 28)),
+            ('t two-sided, Welch df', lambda: 2 * stats.t(welch_df).sf(np.abs(z)), lambda: pvalue(z, welch_df)),
+        ]
+        for name, reference, fast in cases:
+            fast()
+            slow_s, fast_s = time_call(reference, repeats), time_call(fast, repeats)
+            print(f"{name:<28}{n:>10}{slow_s * 1e3:>10.3f}ms{fast_s * 1e3:>10.3f}ms{slow_s / fast_s:>8.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check statcore.fast_pvalue against scipy and time both')
+    parser.add_argument('--points', type=int, default=20_000, help='Statistics per accuracy grid segment')
+    parser.add_argument('--dfs', type=int, default=200, help='Degrees of freedom per accuracy sweep')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1, 1_000, 1_000_000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--skip-speed', action='store_true')
+    args = parser.parse_args()
+
+    failures = check_accuracy(args.points, args.dfs)
+    if not args.skip_speed:
+        check_speed(args.sizes, args.repeats)
+    if failures:
+        sys.exit(f"Error bounds exceeded: {', '.join(failures)}")
@@ -1,30 +1,129 @@
-import streamlit as st
+import io
+
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import stats
-from statsmodels.stats.weightstats import ztest
+import streamlit as st
+from matplotlib.figure import Figure
+
+from app_support import rerun_while_pending, show_diagnostics, uploaded_path
+from statcore import hypothesis
+from statcore.cache import memoize, pin_key
+from statcore.executor import default_executor
+from statcore.hypothesis import generate_data
+from statcore.ingest import list_columns, read_columns
+from statcore.profiling import profiled
+from statcore.resampling import bootstrap_ci, permutation_test
+from statcore.sequential import SequentialTest
+
+perform_t_test = profiled(memoize(hypothesis.perform_t_test), name='perform_t_test')
+perform_z_test = profiled(memoize(hypothesis.perform_z_test), name='perform_z_test')
 
-def generate_data(n, mean, std):
-    return np.random.normal(mean, std, n)
+load_columns = memoize(read_columns)
 
-def perform_t_test(sample1, sample2):
-    statistic, pvalue = stats.ttest_ind(sample1, sample2)
-    return statistic, pvalue
+@memoize
+def distinct_values(path, column):
+    values = load_columns(path, [column])[column]
+    return sorted({v for v in values.tolist() if v is not None and v == v})
 
-def perform_z_test(sample1, sample2):
-    statistic, pvalue = ztest(sample1, sample2)
-    return statistic, pvalue
+def finite(values):
+    mask = np.isfinite(values)
+    return values if mask.all() else values[mask]
+
+# Fixed seeds keep resampling results reproducible, and therefore cacheable
+@memoize
+def perform_permutation_test(sample1, sample2, statistic):
+    return permutation_test(sample1, sample2, statistic, target_error=0.001, seed=0)
+
+@memoize
+def perform_bootstrap(sample1, sample2, statistic):
+    return bootstrap_ci(sample1, sample2, statistic, seed=0)
+
+@memoize
+def perform_sequential_test(sample1, sample2, batch_size=10):
+    # Replays the samples as a stream of micro-batches through an mSPRT
+    test = SequentialTest()
+    path = []
+    for start in range(0, min(len(sample1), len(sample2)), batch_size):
+        test.update(sample1[start:start + batch_size], sample2[start:start + batch_size])
+        path.append(test.pvalue[0])
+    return test.pvalue[0], int(test.stop_n[0]) if test.stopped[0] else None, path
 
 def plot_data(sample1, sample2):
-    plt.figure(figsize=(10, 5))
-    plt.hist(sample1, bins=30, alpha=0.5, label='Sample 1')
-    plt.hist(sample2, bins=30, alpha=0.5, label='Sample 2')
-    plt.legend(loc='upper right')
-    plt.xlabel('Value')
-    plt.ylabel('Frequency')
-    plt.title('Distribution of Samples')
-    plt.grid(True)
-    return plt
+    # A standalone Figure rather than pyplot's global state, so it can be
+    # built on a worker thread
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.hist(sample1, bins=30, alpha=0.5, label='Sample 1')
+    ax.hist(sample2, bins=30, alpha=0.5, label='Sample 2')
+    ax.legend(loc='upper right')
+    ax.set_xlabel('Value')
+    ax.set_ylabel('Frequency')
+    ax.set_title('Distribution of Samples')
+    ax.grid(True)
+    return fig
+
+def render_plot(sample1, sample2):
+    # Rasterizing is the slow part, so it happens on the worker too; the
+    # session only receives PNG bytes
+    buffer = io.BytesIO()
+    plot_data(sample1, sample2).savefig(buffer, format='png')
+    return buffer.getvalue()
+
+def submit(slot, func, *args):
+    # Runs func on the shared worker pool. The task is kept in the session so
+    # later reruns poll it; different inputs replace (and cancel) it.
+    task = default_executor.submit(func, args, replace=st.session_state.get(slot))
+    st.session_state[slot] = task
+    return task
+
+def show_progress(task, label):
+    st.progress(task.progress, text=f"{task.message or label}... {task.elapsed:.1f} s")
+
+# Test name -> (function, arguments after the two samples)
+TESTS = {
+    't-test': (perform_t_test, ()),
+    'z-test': (perform_z_test, ()),
+    'permutation test (mean)': (perform_permutation_test, ('mean',)),
+    'permutation test (median)': (perform_permutation_test, ('median',)),
+    'bootstrap CI (mean)': (perform_bootstrap, ('mean',)),
+    'bootstrap CI (median)': (perform_bootstrap, ('median',)),
+    'sequential (mSPRT)': (perform_sequential_test, ()),
+}
+
+def show_test_result(test_type, result):
+    if test_type == 't-test':
+        statistic, pvalue = result
+        st.write(f"T-statistic: {statistic:.2f}")
+        st.write(f"P-value: {pvalue:.4f}")
+    elif test_type == 'z-test':
+        statistic, pvalue = result
+        st.write(f"Z-statistic: {statistic:.2f}")
+        st.write(f"P-value: {pvalue:.4f}")
+    elif test_type.startswith('permutation test'):
+        statistic = 'median' if 'median' in test_type else 'mean'
+        pvalue = result['pvalue']
+        st.write(f"Difference in {statistic}s: {result['statistic']:.2f}")
+        precision = 'exact' if result['exact'] else f"±{result['mc_error']:.4f}"
+        st.write(f"P-value: {pvalue:.4f} ({precision}, {result['n_resamples']} permutations)")
+    elif test_type == 'sequential (mSPRT)':
+        pvalue, stop_n, path = result
+        st.write(f"Always-valid p-value: {pvalue:.4f}")
+        st.write(f"Stop signal after {stop_n} observations across both samples" if stop_n else "No stop signal yet")
+        st.line_chart(path)
+    else:
+        statistic = 'median' if 'median' in test_type else 'mean'
+        pvalue = None
+        st.write(f"Difference in {statistic}s: {result['estimate']:.2f}")
+        st.write(f"95% CI: [{result['low']:.2f}, {result['high']:.2f}] ({result['n_resamples']} resamples)")
+
+    if pvalue is None:
+        if result['low'] > 0 or result['high'] < 0:
+            st.success("Reject the null hypothesis (95% CI excludes 0)")
+        else:
+            st.error("Fail to reject the null hypothesis (95% CI contains 0)")
+    elif pvalue < 0.05:
+        st.success("Reject the null hypothesis (p < 0.05)")
+    else:
+        st.error("Fail to reject the null hypothesis (p >= 0.05)")
 
 def main():
     st.title('Hypothesis Testing Playground')
@@ -39,29 +138,63 @@ def main():
         if st.button('Generate Samples'):
             sample1 = generate_data(n, mean1, std1)
             sample2 = generate_data(n, mean2, std2)
+            # Hashed once here rather than by every task submission on later reruns
+            pin_key(sample1)
+            pin_key(sample2)
             st.session_state.sample1 = sample1
             st.session_state.sample2 = sample2
+
+        st.header('Load Data')
+        path = uploaded_path('CSV, Parquet, Arrow IPC or .npy file')
+        numeric = list_columns(path, numeric_only=True) if path else []
+        if path and not numeric:
+            st.error('The file has no numeric columns')
+        elif path:
+            layout = st.radio('Samples are', ['Two columns', 'One column split by group'])
+            if layout == 'Two columns':
+                column1 = st.selectbox('Sample 1 column', numeric)
+                column2 = st.selectbox('Sample 2 column', numeric, index=min(1, len(numeric) - 1))
+                requests = [(column1, None), (column2, None)]
+            else:
+                value = st.selectbox('Value column', numeric)
+                columns = list_columns(path)
+                labels = [c for c in columns if c not in numeric]
+                group = st.selectbox('Group column', columns, index=columns.index(labels[0]) if labels else 0)
+                groups = distinct_values(path, group)
+                group1 = st.selectbox('Sample 1 group', groups)
+                group2 = st.selectbox('Sample 2 group', groups, index=min(1, len(groups) - 1))
+                requests = [(value, [(group, '==', group1)]), (value, [(group, '==', group2)])]
+            if st.button('Load Samples'):
+                # Only the chosen column is read, and the group filter is pushed down to the reader
+                samples = [finite(load_columns(path, [column], filters, 'float64')[column])
+                           for column, filters in requests]
+                for sample in samples:
+                    pin_key(sample)
+                st.session_state.sample1, st.session_state.sample2 = samples
     
+    pending = []
     if 'sample1' in st.session_state and 'sample2' in st.session_state:
+        sample1, sample2 = st.session_state.sample1, st.session_state.sample2
         st.subheader('Visualize Data Distribution')
-        fig = plot_data(st.session_state.sample1, st.session_state.sample2)
-        st.pyplot(fig)
+        plot_task = submit('plot_task', render_plot, sample1, sample2)
+        if plot_task.done():
+            st.image(plot_task.result())
+        else:
+            show_progress(plot_task, 'Plotting samples')
+            pending.append(plot_task)
 
         st.subheader('Perform Hypothesis Test')
-        test_type = st.selectbox('Select Test Type', ['t-test', 'z-test'])
-        if test_type == 't-test':
-            statistic, pvalue = perform_t_test(st.session_state.sample1, st.session_state.sample2)
-            st.write(f"T-statistic: {statistic:.2f}")
-            st.write(f"P-value: {pvalue:.4f}")
-        elif test_type == 'z-test':
-            statistic, pvalue = perform_z_test(st.session_state.sample1, st.session_state.sample2)
-            st.write(f"Z-statistic: {statistic:.2f}")
-            st.write(f"P-value: {pvalue:.4f}")
-
-        if pvalue < 0.05:
-            st.success("Reject the null hypothesis (p < 0.05)")
+        test_type = st.selectbox('Select Test Type', list(TESTS))
+        func, extra_args = TESTS[test_type]
+        test_task = submit('test_task', func, sample1, sample2, *extra_args)
+        if test_task.done():
+            show_test_result(test_type, test_task.result())
         else:
-            st.error("Fail to reject the null hypothesis (p >= 0.05)")
+            show_progress(test_task, f'Running {test_type}')
+            pending.append(test_task)
+
+    show_diagnostics(default_executor)
+    rerun_while_pending(pending)
 
 if __name__ == '__main__':
     main()
@@ -1,37 +1,72 @@
 import streamlit as st
 import numpy as np
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from sklearn.preprocessing import StandardScaler
-from scipy.stats import gaussian_kde
 
-def generate_data():
-    np.random.seed(None)  # Set the seed to None for different data each time
-    x = np.random.randint(0, 100, 100)
-    y = np.random.randint(0, 100, 100)
-    return pd.DataFrame({'x': x, 'y': y})
-
-def normalize_data(data):
-    scaler = StandardScaler()
-    normalized_data = scaler.fit_transform(data)
-    return pd.DataFrame(normalized_data, columns=['x', 'y'])
-
-def plot_data(original_data, normalized_data):
+from app_support import column_pair, rerun_while_pending, show_diagnostics, uploaded_path
+from statcore.cache import memoize
+from statcore.executor import default_executor, report_progress
+from statcore.fast_kde import KDE_ROW_THRESHOLD, affine_kde, make_kde
+from statcore.ingest import list_columns, read_frame
+from statcore.normalization import generate_data, normalize_data
+from statcore.plotting import payload_bytes, scatter_trace
+from statcore.profiling import profiled
+
+cached_generate_data = memoize(generate_data)
+cached_normalize_data = profiled(memoize(normalize_data), name='normalize_data')
+
+@memoize
+def load_data(path, x_column, y_column):
+    # Only the two chosen columns are read; rows with missing values are dropped
+    data = read_frame(path, [x_column, y_column], dtype=np.float64).set_axis(['x', 'y'], axis=1)
+    return data.dropna()
+
+def zoom_slider(label, values):
+    low, high = float(values.min()), float(values.max())
+    return st.slider(label, low, max(high, low + 1.0), (low, max(high, low + 1.0)))
+
+def _affine_map(original, normalized):
+    # (loc, scale) such that original = loc + scale * normalized
+    scale = original.std() / normalized.std()
+    return original.mean() - scale * normalized.mean(), scale
+
+@profiled(name='kde_curves')
+@memoize
+def kde_curves(original, normalized, kde_threshold=KDE_ROW_THRESHOLD):
+    # 200-point density curves of one column before and after normalization
+    kde = make_kde(original, kde_threshold)
+    value_range = np.linspace(original.min(), original.max(), 200)
+    # The normalized KDE is the original one pushed through the affine map
+    kde_norm = affine_kde(kde, *_affine_map(original, normalized))
+    value_range_norm = np.linspace(normalized.min(), normalized.max(), 200)
+    return value_range, kde(value_range), value_range_norm, kde_norm(value_range_norm)
+
+def _normalized_window(window, original, normalized):
+    if window is None:
+        return None
+    loc, scale = _affine_map(original, normalized)
+    return ((window[0] - loc) / scale, (window[1] - loc) / scale)
+
+@memoize
+def build_figure(original_data, normalized_data, kde_threshold=KDE_ROW_THRESHOLD, x_window=None, y_window=None):
+    # x_window/y_window zoom the scatter plots (in original units); large inputs
+    # are re-aggregated for the visible window
     fig = make_subplots(rows=2, cols=2, subplot_titles=("Original Data", "Original Distribution",
                                                         "Normalized Data", "Normalized Distribution"),
                         column_widths=[0.7, 0.3])
 
-    fig.add_trace(go.Scatter(x=original_data['x'], y=original_data['y'], mode='markers'), row=1, col=1)
+    report_progress(0.0, 'Estimating x density')
+    x_range, x_density, x_range_norm, x_density_norm = kde_curves(original_data['x'], normalized_data['x'], kde_threshold)
+    report_progress(0.3, 'Estimating y density')
+    y_range, y_density, y_range_norm, y_density_norm = kde_curves(original_data['y'], normalized_data['y'], kde_threshold)
+    report_progress(0.6, 'Building scatter plots')
 
-    x_kde = gaussian_kde(original_data['x'])
-    x_range = np.linspace(original_data['x'].min(), original_data['x'].max(), 200)
-    y_kde = gaussian_kde(original_data['y'])
-    y_range = np.linspace(original_data['y'].min(), original_data['y'].max(), 200)
+    trace, original_mode = scatter_trace(original_data['x'], original_data['y'], x_range=x_window, y_range=y_window)
+    fig.add_trace(trace, row=1, col=1)
 
-    fig.add_trace(go.Scatter(x=x_range, y=x_kde(x_range), mode='lines', name='X', line=dict(color='#1f77b4')), row=1, col=2)
-    fig.add_trace(go.Scatter(x=y_range, y=y_kde(y_range), mode='lines', name='Y', line=dict(color='#ff7f0e')), row=1, col=2)
+    fig.add_trace(go.Scatter(x=x_range, y=x_density, mode='lines', name='X', line=dict(color='#1f77b4')), row=1, col=2)
+    fig.add_trace(go.Scatter(x=y_range, y=y_density, mode='lines', name='Y', line=dict(color='#ff7f0e')), row=1, col=2)
 
     fig.update_xaxes(title_text="Value", row=1, col=2)
     fig.update_yaxes(title_text="Density", range=[0, 1], row=1, col=2)
@@ -40,15 +75,13 @@ def plot_data(original_data, normalized_data):
                        text=f"X Mean: {original_data['x'].mean():.2f}<br>X Std: {original_data['x'].std():.2f}<br>Y Mean: {original_data['y'].mean():.2f}<br>Y Std: {original_data['y'].std():.2f}",
                        row=1, col=2)
 
-    fig.add_trace(go.Scatter(x=normalized_data['x'], y=normalized_data['y'], mode='markers'), row=2, col=1)
-
-    x_kde_norm = gaussian_kde(normalized_data['x'])
-    x_range_norm = np.linspace(normalized_data['x'].min(), normalized_data['x'].max(), 200)
-    y_kde_norm = gaussian_kde(normalized_data['y'])
-    y_range_norm = np.linspace(normalized_data['y'].min(), normalized_data['y'].max(), 200)
+    trace, normalized_mode = scatter_trace(normalized_data['x'], normalized_data['y'],
+                                           x_range=_normalized_window(x_window, original_data['x'], normalized_data['x']),
+                                           y_range=_normalized_window(y_window, original_data['y'], normalized_data['y']))
+    fig.add_trace(trace, row=2, col=1)
 
-    fig.add_trace(go.Scatter(x=x_range_norm, y=x_kde_norm(x_range_norm), mode='lines', name='X', line=dict(color='#1f77b4')), row=2, col=2)
-    fig.add_trace(go.Scatter(x=y_range_norm, y=y_kde_norm(y_range_norm), mode='lines', name='Y', line=dict(color='#ff7f0e')), row=2, col=2)
+    fig.add_trace(go.Scatter(x=x_range_norm, y=x_density_norm, mode='lines', name='X', line=dict(color='#1f77b4')), row=2, col=2)
+    fig.add_trace(go.Scatter(x=y_range_norm, y=y_density_norm, mode='lines', name='Y', line=dict(color='#ff7f0e')), row=2, col=2)
 
     fig.update_xaxes(title_text="Normalized Value", row=2, col=2)
     fig.update_yaxes(title_text="Density", row=2, col=2)
@@ -58,7 +91,27 @@ def plot_data(original_data, normalized_data):
                        row=2, col=2)
 
     fig.update_layout(height=800, width=800, title_text="Data Visualization")
-    st.plotly_chart(fig)
+    report_progress(0.9, 'Serializing figure')
+    # Cached as a plain figure spec, which st.plotly_chart renders directly
+    spec = fig.to_dict()
+    return spec, {'modes': (original_mode, normalized_mode), 'payload_bytes': payload_bytes(spec)}
+
+@profiled(name='plot_data')
+def plot_data(original_data, normalized_data, kde_threshold=KDE_ROW_THRESHOLD, x_window=None, y_window=None):
+    # The figure is built on the shared worker pool; a zoom or data change
+    # replaces (and cancels) the previous build. Returns the task so the
+    # caller can keep polling while it runs.
+    task = default_executor.submit(build_figure, (original_data, normalized_data, kde_threshold, x_window, y_window),
+                                   replace=st.session_state.get('figure_task'))
+    st.session_state.figure_task = task
+    if not task.done():
+        st.progress(task.progress, text=f"{task.message or 'Building figure'}... {task.elapsed:.1f} s")
+        return task
+    spec, info = task.result()
+    st.plotly_chart(spec)
+    st.caption(f"Scatter rendering: {info['modes'][0]} / {info['modes'][1]}, "
+               f"payload {info['payload_bytes'] / 1024:.1f} KiB")
+    return task
 
 def main():
     st.title('Standard Normalization Demo')
@@ -71,18 +124,45 @@ def main():
     st.write('- μ is the mean of the feature')
     st.write('- σ is the standard deviation of the feature')
 
-    data = generate_data()
+    source = st.radio('Data source', ['Generated', 'Upload a file'], horizontal=True)
+    data = None
+    if source == 'Upload a file':
+        path = uploaded_path('CSV, Parquet, Arrow IPC or .npy file')
+        numeric = list_columns(path, numeric_only=True) if path else []
+        if path and len(numeric) < 2:
+            st.error('The file needs at least two numeric columns')
+        elif path:
+            columns = column_pair(numeric)
+            data = load_data(path, *columns) if columns else None
+        if data is None:
+            if not path:
+                st.info('Upload a dataset to normalize it')
+            return
+    else:
+        # Keep one dataset per session until the user asks for a new one
+        new_data = st.button('Generate New Data')
+        if 'seed' not in st.session_state or new_data:
+            st.session_state.seed = int(np.random.SeedSequence().entropy % 2**32)
+        n_rows = st.select_slider('Number of rows', options=[100, 1_000, 10_000, 100_000, 1_000_000], value=100)
+        data = cached_generate_data(st.session_state.seed, n_rows)
 
     if st.checkbox('Show original data'):
         st.write(data)
 
-    normalized_data = normalize_data(data)
+    normalized_data = cached_normalize_data(data)
 
     if st.checkbox('Show normalized data'):
         st.write(normalized_data)
 
+    # Remember the click so zooming (which reruns the script) keeps the plot
     if st.button('Visualize Data'):
-        plot_data(data, normalized_data)
+        st.session_state.visualize = True
+    if st.session_state.get('visualize'):
+        x_window = zoom_slider('Zoom: x range', data['x'])
+        y_window = zoom_slider('Zoom: y range', data['y'])
+        figure_task = plot_data(data, normalized_data, x_window=x_window, y_window=y_window)
+    else:
+        figure_task = None
 
     st.write('Standard normalization is a technique used to standardize the features of a dataset. It transforms the data to have a mean of 0 and a standard deviation of 1. This helps in scaling the features to a similar range, which is beneficial for many machine learning algorithms.')
 
@@ -90,5 +170,10 @@ def main():
 
     st.write('Observe how the normalized data points are centered around 0 and have a similar scale on both axes. This is the effect of standard normalization, which helps in treating all features with equal importance and can improve the performance of certain machine learning algorithms.')
 
+    show_diagnostics(default_executor)
+
+    # Rerun until the figure is ready
+    rerun_while_pending([figure_task])
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,26 @@
+# Headless numeric core shared by the Streamlit apps. Submodules import only
+# numpy eagerly; scipy, sklearn, statsmodels and pandas load on first use, and
+# nothing here imports streamlit or plotly.
+import importlib
+
+_EXPORTS = {
+    'calculate_distance': 'distance',
+    'pairwise_distances': 'pairwise',
+    'normalize_data': 'normalization',
+    'perform_t_test': 'hypothesis',
+    'perform_z_test': 'hypothesis',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,122 @@
+import numpy as np
+
+from .fast_pvalue import pvalue as _pvalue
+
+
+def _as_batch(samples, mask):
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim == 1:
+        samples = samples[None, :]
+    if samples.ndim != 2:
+        raise ValueError("samples must be a 2-D array of shape (metrics, observations)")
+    if mask is None:
+        mask = ~np.isnan(samples)
+    else:
+        mask = np.broadcast_to(np.asarray(mask, dtype=bool), samples.shape)
+    return samples, mask
+
+
+def batch_moments(samples, mask=None):
+    # Row-wise count, mean and unbiased variance over the masked-in entries.
+    # Missing entries (mask False, or NaN when no mask is given) are ignored.
+    samples, mask = _as_batch(samples, mask)
+    values = np.where(mask, samples, 0.0)
+    n = mask.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = values.sum(axis=1) / n
+        dev = np.where(mask, samples - mean[:, None], 0.0)
+        var = np.einsum('ij,ij->i', dev, dev) / (n - 1)
+    return n, mean, var
+
+
+def t_test_from_moments(n1, mean1, var1, n2=None, mean2=None, var2=None, equal_var=True,
+                        popmean=0.0, alternative='two-sided'):
+    # t-test from per-group count, mean and unbiased variance (scalars or arrays);
+    # one-sample against popmean when n2 is None
+    n1, mean1, var1 = (np.asarray(v, dtype=np.float64) for v in (n1, mean1, var1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if n2 is None:
+            df = n1 - 1.0
+            statistic = (mean1 - popmean) / np.sqrt(var1 / n1)
+        else:
+            n2, mean2, var2 = (np.asarray(v, dtype=np.float64) for v in (n2, mean2, var2))
+            if equal_var:
+                df = n1 + n2 - 2.0
+                pooled = ((n1 - 1) * var1 + (n2 - 1) * var2) / df
+                se = np.sqrt(pooled * (1.0 / n1 + 1.0 / n2))
+            else:
+                v1, v2 = var1 / n1, var2 / n2
+                se = np.sqrt(v1 + v2)
+                df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+            statistic = (mean1 - mean2) / se
+        pvalue = _pvalue(statistic, df, alternative)
+    return statistic, pvalue
+
+
+def z_test_from_moments(n1, mean1, var1, n2=None, mean2=None, var2=None, usevar='pooled',
+                        value=0.0, alternative='two-sided'):
+    # Equivalent of statsmodels' ztest (sample standard deviations, ddof=1)
+    n1, mean1, var1 = (np.asarray(v, dtype=np.float64) for v in (n1, mean1, var1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if n2 is None:
+            statistic = (mean1 - value) / np.sqrt(var1 / n1)
+        else:
+            n2, mean2, var2 = (np.asarray(v, dtype=np.float64) for v in (n2, mean2, var2))
+            if usevar == 'pooled':
+                pooled = ((n1 - 1) * var1 + (n2 - 1) * var2) / (n1 + n2 - 2.0)
+                se = np.sqrt(pooled * (1.0 / n1 + 1.0 / n2))
+            elif usevar == 'unequal':
+                se = np.sqrt(var1 / n1 + var2 / n2)
+            else:
+                raise ValueError(f"usevar must be 'pooled' or 'unequal', got {usevar}")
+            statistic = (mean1 - mean2 - value) / se
+        pvalue = _pvalue(statistic, alternative=alternative)
+    return statistic, pvalue
+
+
+def _paired_moments(sample1, sample2, mask1, mask2):
+    moments1 = batch_moments(sample1, mask1)
+    if sample2 is None:
+        return moments1 + (None, None, None)
+    moments2 = batch_moments(sample2, mask2)
+    if moments2[0].shape != moments1[0].shape:
+        raise ValueError(f"sample1 has {moments1[0].shape[0]} rows, sample2 has {moments2[0].shape[0]}")
+    return moments1 + moments2
+
+
+def batch_t_test(sample1, sample2=None, mask1=None, mask2=None, equal_var=True, popmean=0.0,
+                 alternative='two-sided'):
+    # One-sample (sample2 None), pooled-variance or Welch t-test for every row
+    return t_test_from_moments(*_paired_moments(sample1, sample2, mask1, mask2),
+                               equal_var=equal_var, popmean=popmean, alternative=alternative)
+
+
+def batch_z_test(sample1, sample2=None, mask1=None, mask2=None, usevar='pooled', value=0.0,
+                 alternative='two-sided'):
+    # Row-wise z-test, matching statsmodels' ztest on each row
+    return z_test_from_moments(*_paired_moments(sample1, sample2, mask1, mask2),
+                               usevar=usevar, value=value, alternative=alternative)
+
+
+def adjust_pvalues(pvalues, method='fdr_bh', alpha=0.05):
+    # Multiple-testing correction over a batch; NaN p-values are passed through
+    # and excluded from the number of hypotheses. Returns (reject, adjusted).
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    adjusted = np.full(pvalues.shape, np.nan)
+    valid = ~np.isnan(pvalues)
+    p = pvalues[valid]
+    m = p.size
+    if method == 'bonferroni':
+        adj = np.minimum(p * m, 1.0)
+    elif method == 'fdr_bh':
+        order = np.argsort(p)
+        ranked = p[order] * m / np.arange(1, m + 1)
+        ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+        adj = np.empty(m)
+        adj[order] = np.minimum(ranked, 1.0)
+    else:
+        raise ValueError(f"method must be 'fdr_bh' or 'bonferroni', got {method}")
+    adjusted[valid] = adj
+    reject = np.zeros(pvalues.shape, dtype=bool)
+    reject[valid] = adj <= alpha
+    return reject, adjusted
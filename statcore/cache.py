@@ -0,0 +1,174 @@
+import functools
+import hashlib
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# id -> (weakref, key) for objects whose key was computed once and pinned
+_pinned = {}
+
+
+def _unpin(ident, ref):
+    entry = _pinned.get(ident)
+    if entry is not None and entry[0] is ref:
+        _pinned.pop(ident, None)
+
+
+def pin_key(value, key=None):
+    # Remembers value's cache key for as long as value is alive, so arrays and
+    # frames passed back in on every rerun are not rehashed each time. The key
+    # is value's content key unless one is given (e.g. the inputs it was built
+    # from); either way value must not be mutated afterwards. Objects that do
+    # not support weak references are not pinned.
+    key = make_key(value) if key is None else ('pinned', key)
+    ident = id(value)
+    try:
+        ref = weakref.ref(value, lambda ref: _unpin(ident, ref))
+    except TypeError:
+        return key
+    _pinned[ident] = (ref, key)
+    return key
+
+
+def make_key(value):
+    # Hashable, content-based key for the argument types the apps pass around
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return value
+    pinned = _pinned.get(id(value))
+    if pinned is not None and pinned[0]() is value:
+        return pinned[1]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return ('ndarray', value.shape, value.dtype.str, _digest(np.ascontiguousarray(value).tobytes()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(make_key(v) for v in value)
+    if isinstance(value, dict):
+        return ('dict',) + tuple(sorted((make_key(k), make_key(v)) for k, v in value.items()))
+    module = type(value).__module__
+    if module.startswith('pandas'):
+        import pandas as pd
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            hashed = pd.util.hash_pandas_object(value, index=True).to_numpy()
+            columns = tuple(value.columns) if isinstance(value, pd.DataFrame) else value.name
+            return (type(value).__name__, columns, _digest(hashed.tobytes()))
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+def sizeof(value):
+    # Approximate memory held by a cached value
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'memory_usage') and hasattr(value, 'columns'):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, 'memory_usage'):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    # Thread-safe LRU cache bounded by entry count and approximate bytes, with
+    # hit/miss/eviction counters per namespace. Streamlit runs every session in
+    # a thread of one server process, so a module-level instance is shared by
+    # all sessions. Cached values must be treated as read-only.
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self.current_bytes = 0
+
+    def _count(self, namespace, field):
+        counters = self._counters.setdefault(namespace, {'hits': 0, 'misses': 0, 'evictions': 0})
+        counters[field] += 1
+
+    def get(self, namespace, key, default=None):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self._count(namespace, 'misses')
+                return default
+            self._entries.move_to_end((namespace, key))
+            self._count(namespace, 'hits')
+            return entry[0]
+
+    def put(self, namespace, key, value):
+        size = sizeof(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            old = self._entries.pop((namespace, key), None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[(namespace, key)] = (value, size)
+            self.current_bytes += size
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                (evicted_namespace, _), (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self._count(evicted_namespace, 'evictions')
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            totals = {'hits': 0, 'misses': 0, 'evictions': 0}
+            for counters in self._counters.values():
+                for field, count in counters.items():
+                    totals[field] += count
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                **totals,
+                'namespaces': {name: dict(counters) for name, counters in self._counters.items()},
+            }
+
+
+default_cache = LRUCache()
+
+_MISSING = object()
+
+
+def memoize(func=None, cache=None, namespace=None):
+    # Caches func's return value keyed on the content of its arguments. The
+    # value's own key is pinned to those arguments, so passing it on to other
+    # memoized functions or the executor costs no hashing.
+    if func is None:
+        return functools.partial(memoize, cache=cache, namespace=namespace)
+    target = cache if cache is not None else default_cache
+    name = namespace or f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (make_key(args), make_key(kwargs))
+        value = target.get(name, key, _MISSING)
+        if value is _MISSING:
+            value = target.put(name, key, func(*args, **kwargs))
+            pin_key(value, (name, key))
+        return value
+
+    wrapper.cache = target
+    wrapper.namespace = name
+    return wrapper
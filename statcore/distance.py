@@ -0,0 +1,28 @@
+import numpy as np
+
+from .pairwise import FORMULAS, pairwise_distances
+from .sparse_distance import is_sparse
+
+
+def _dense_pair(p1, p2, metric):
+    # Two 1-D arrays of the same length: the per-pair path, without the
+    # batching, copies and output allocation of pairwise_distances
+    diff = np.abs(np.subtract(p1, p2, dtype=np.float64))
+    if metric == 'Euclidean':
+        return np.sqrt(np.dot(diff, diff))
+    if metric == 'Manhattan':
+        return diff.sum()
+    return diff.max()
+
+
+def calculate_distance(p1, p2, metric):
+    if (isinstance(p1, np.ndarray) and isinstance(p2, np.ndarray) and p1.ndim == 1
+            and p1.shape == p2.shape and p1.size and metric in ('Euclidean', 'Manhattan', 'Chebyshev')):
+        return _dense_pair(p1, p2, metric), FORMULAS[metric]
+    # Sparse rows (e.g. scipy CSR) are compared without densifying
+    if not is_sparse(p1):
+        p1 = np.atleast_2d(p1)
+    if not is_sparse(p2):
+        p2 = np.atleast_2d(p2)
+    distance = pairwise_distances(p1, p2, metric)[0, 0]
+    return distance, FORMULAS[metric]
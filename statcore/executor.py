@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .cache import make_key
+
+_local = threading.local()
+
+
+def report_progress(fraction, message=None):
+    # Called from inside a task to publish progress; also a cancellation
+    # point, raising CancelledError once every caller has given up on the task.
+    # Outside a task (a plain synchronous call) it does nothing.
+    task = getattr(_local, 'task', None)
+    if task is None:
+        return
+    if task.cancel_requested.is_set():
+        raise CancelledError
+    task.progress = min(max(float(fraction), 0.0), 1.0)
+    if message is not None:
+        task.message = message
+
+
+class Task:
+    # Handle to a submitted computation. Identical requests share one Task, so
+    # it counts its holders and is only cancelled when the last one lets go.
+    def __init__(self, key, executor):
+        self.key = key
+        self.future = None
+        self.progress = 0.0
+        self.message = None
+        self.started = time.monotonic()
+        self.cancel_requested = threading.Event()
+        self._executor = executor
+        self._holders = 1
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def done(self):
+        return self.future.done()
+
+    def cancelled(self):
+        return self.cancel_requested.is_set() or self.future.cancelled()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def release(self):
+        self._executor._release(self)
+
+
+class TaskExecutor:
+    # Bounded pool that runs slow computations off the Streamlit script thread.
+    # The UI submits, keeps the Task and polls it on later reruns:
+    #   - requests with the same function and argument content that are still
+    #     in flight are deduplicated, across sessions too;
+    #   - submitting with replace=<previous task> releases the previous one when
+    #     the inputs have changed, cancelling it if nobody else holds it (queued
+    #     work is dropped, running thread tasks stop at their next
+    #     report_progress call);
+    #   - thread tasks can report progress with report_progress.
+    # kind='process' sidesteps the GIL for pure-Python work, at the price of
+    # pickling arguments and losing progress reporting and cooperative cancel.
+    def __init__(self, max_workers=None, kind='thread'):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"kind must be 'thread' or 'process', got {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        pool_cls = ThreadPoolExecutor if kind == 'thread' else ProcessPoolExecutor
+        self._pool = pool_cls(max_workers=self.max_workers)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.counters = {'submitted': 0, 'deduplicated': 0, 'cancelled': 0}
+
+    @staticmethod
+    def key_for(func, args=(), kwargs=None):
+        name = getattr(func, 'namespace', None) or f"{func.__module__}.{func.__qualname__}"
+        return (name, make_key(tuple(args)), make_key(kwargs or {}))
+
+    def submit(self, func, args=(), kwargs=None, replace=None):
+        key = self.key_for(func, args, kwargs)
+        if replace is not None and replace.key == key and not replace.cancelled():
+            return replace
+        with self._lock:
+            task = self._in_flight.get(key)
+            created = task is None
+            if not created:
+                task._holders += 1
+                self.counters['deduplicated'] += 1
+            else:
+                task = Task(key, self)
+                if self.kind == 'thread':
+                    task.future = self._pool.submit(self._run, task, func, args, kwargs or {})
+                else:
+                    task.future = self._pool.submit(func, *args, **(kwargs or {}))
+                self._in_flight[key] = task
+                self.counters['submitted'] += 1
+        if created:
+            task.future.add_done_callback(lambda _: self._finished(task))
+        if replace is not None and not replace.cancel_requested.is_set():
+            replace.release()
+        return task
+
+    @staticmethod
+    def _run(task, func, args, kwargs):
+        if task.cancel_requested.is_set():
+            raise CancelledError
+        _local.task = task
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.task = None
+
+    def _finished(self, task):
+        with self._lock:
+            if self._in_flight.get(task.key) is task:
+                del self._in_flight[task.key]
+        if not task.future.cancelled() and task.future.exception() is None:
+            task.progress = 1.0
+
+    def _release(self, task):
+        with self._lock:
+            task._holders -= 1
+            if task._holders > 0 or task.future.done():
+                return
+            task.cancel_requested.set()
+            task.future.cancel()
+            # A fresh request with the same inputs must not attach to a dying task
+            if self._in_flight.get(task.key) is task:
+                del self._in_flight[task.key]
+            self.counters['cancelled'] += 1
+
+    def stats(self):
+        with self._lock:
+            return {'kind': self.kind, 'max_workers': self.max_workers, 'in_flight': len(self._in_flight),
+                    **self.counters}
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+default_executor = TaskExecutor()
@@ -0,0 +1,101 @@
+import numpy as np
+
+# Grid nodes per bandwidth. The binning and interpolation errors depend on
+# the node spacing relative to the bandwidth, so the grid is sized from the
+# data range rather than fixed: heavy tails or a single outlier widen the
+# range and would otherwise leave only a few nodes per kernel width.
+GRID_POINTS_PER_BANDWIDTH = 32
+MIN_GRID_SIZE = 512
+
+# Largest grid built; a wider one means gaussian_kde is used instead
+MAX_GRID_SIZE = 1 << 22
+
+# Kernel support in bandwidths; the Gaussian tail beyond this is below 1e-11
+KERNEL_CUTOFF = 7.0
+
+# Rows above which plot_data switches from gaussian_kde to BinnedKDE
+KDE_ROW_THRESHOLD = 50_000
+
+
+def bandwidth_factor(n, bw_method='scott'):
+    # Same factors as scipy.stats.gaussian_kde for 1-D data
+    if bw_method == 'scott':
+        return n ** (-1.0 / 5)
+    if bw_method == 'silverman':
+        return (n * 3.0 / 4.0) ** (-1.0 / 5)
+    if np.isscalar(bw_method):
+        return float(bw_method)
+    raise ValueError(f"bw_method must be 'scott', 'silverman' or a scalar, got {bw_method}")
+
+
+class BinnedKDE:
+    # 1-D Gaussian KDE that linearly bins the data onto a regular grid and
+    # convolves the bin counts with the kernel by FFT: O(n + G log G) instead
+    # of gaussian_kde's O(n * points). The grid has points_per_bandwidth
+    # nodes per bandwidth over the data range plus the kernel cutoff, so G
+    # grows with range / bandwidth (at most ~ k * sqrt(2n) * n^0.2 for the
+    # Scott/Silverman rules, since one outlier raises the std with the range).
+    # The error against gaussian_kde shrinks with (1 / points_per_bandwidth)²;
+    # at the default of 32 it stays below 1e-3 of the peak density, which
+    # tests/test_fast_kde.py checks on 100k-row normal, bimodal, exponential,
+    # lognormal σ=2, Cauchy and single-outlier samples. Treat 1e-3 as the
+    # bound: the measured error depends on the sample and evaluation points.
+    # Points between grid nodes are interpolated. Raises ValueError when the
+    # grid would exceed MAX_GRID_SIZE.
+    def __init__(self, data, bw_method='scott', points_per_bandwidth=GRID_POINTS_PER_BANDWIDTH):
+        data = np.asarray(data, dtype=np.float64).ravel()
+        n = data.size
+        if n < 2:
+            raise ValueError("BinnedKDE needs at least two observations")
+        std = data.std(ddof=1)
+        if std == 0:
+            raise ValueError("BinnedKDE needs data with non-zero variance")
+        self.n = n
+        self.bandwidth = bandwidth_factor(n, bw_method) * std
+
+        pad = KERNEL_CUTOFF * self.bandwidth
+        lo, hi = data.min() - pad, data.max() + pad
+        grid_size = max(MIN_GRID_SIZE, int(np.ceil((hi - lo) / self.bandwidth * points_per_bandwidth)) + 1)
+        if grid_size > MAX_GRID_SIZE:
+            raise ValueError(f"BinnedKDE would need {grid_size} grid points (range / bandwidth too large)")
+        self.grid = np.linspace(lo, hi, grid_size)
+        delta = self.grid[1] - self.grid[0]
+
+        # Linear binning: split each point's unit mass between its two neighbours
+        pos = (data - lo) / delta
+        left = np.clip(np.floor(pos).astype(np.intp), 0, grid_size - 2)
+        frac = pos - left
+        counts = np.bincount(left, weights=1.0 - frac, minlength=grid_size)
+        counts += np.bincount(left + 1, weights=frac, minlength=grid_size)
+
+        half = min(grid_size - 1, int(np.ceil(KERNEL_CUTOFF * self.bandwidth / delta)))
+        offsets = np.arange(-half, half + 1) * delta
+        kernel = np.exp(-0.5 * (offsets / self.bandwidth) ** 2)
+        kernel /= np.sqrt(2 * np.pi) * self.bandwidth * n
+        from scipy.signal import fftconvolve
+
+        self.density = np.maximum(fftconvolve(counts, kernel, mode='same'), 0.0)
+
+    def evaluate(self, points):
+        return np.interp(np.asarray(points, dtype=np.float64), self.grid, self.density,
+                         left=0.0, right=0.0)
+
+    __call__ = evaluate
+
+
+def make_kde(values, row_threshold=KDE_ROW_THRESHOLD, bw_method='scott'):
+    values = np.asarray(values, dtype=np.float64)
+    if values.size > row_threshold:
+        try:
+            return BinnedKDE(values, bw_method)
+        except ValueError:
+            pass  # Range too wide for a grid at this bandwidth; evaluate exactly
+    from scipy.stats import gaussian_kde
+
+    return gaussian_kde(values, bw_method)
+
+
+def affine_kde(kde, loc, scale):
+    # Density of z = (x - loc) / scale given a KDE of x. Scott/Silverman
+    # bandwidths scale with the data, so this equals refitting on z.
+    return lambda z: scale * kde(loc + scale * np.asarray(z, dtype=np.float64))
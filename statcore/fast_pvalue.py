@@ -0,0 +1,260 @@
+from functools import lru_cache
+
+import numpy as np
+
+# The normal needs no table: scipy.special.ndtr is already a vectorized
+# rational approximation accurate to double precision, and calling it
+# directly skips scipy.stats' per-call overhead. The Student-t sf has no such
+# shortcut (stdtr evaluates an incomplete beta function per element), so it
+# is interpolated from tables instead.
+
+# Tail probabilities the t tables cover; smaller ones fall back to the exact
+# stdtr, which keeps full relative precision out to underflow
+TABLE_MIN_SF = 1e-30
+
+# Intervals per table. Each interval holds the cubic Hermite interpolant of
+# log sf through its end points, matching value and slope at both ends.
+TABLE_SIZE = 2048
+
+# Tables sit at df = exp(k * DF_STEP), about 0.8% apart; other df are cubic
+# Lagrange interpolated in log df between the four nearest buckets
+DF_STEP = 1.0 / 128
+DF_MIN, DF_MAX = 1.0, 1e8
+
+# Most tables one call with per-element df stacks. Building a table costs
+# about as much as stdtr on a few thousand values, so elements whose df fall
+# in rarer buckets beyond this go to stdtr instead.
+MAX_CALL_TABLES = 256
+
+# Up to this many values stdtr costs less than the fixed overhead of a table
+# lookup, so small inputs (e.g. a single live test) are computed exactly
+EXACT_MAX_SIZE = 64
+
+# Up to this many values a scalar df blends only the table rows they use;
+# larger arrays blend (and cache) the whole table, which is cheaper by then
+BLEND_ROWS_MAX_SIZE = 1024
+
+# Maximum errors of t_sf and t_cdf against scipy.special.stdtr for every df
+# in [DF_MIN, DF_MAX] (checked by tests/test_fast_pvalue.py). The absolute
+# bound holds everywhere; the relative one on the tail side (values at most
+# 0.5). Two-sided p-values are twice a tail, so their absolute bound doubles
+# and the relative one, covering every two-sided p-value, is unchanged.
+# Outside the tables results are exact.
+T_ABS_ERROR, T_REL_ERROR = 2e-8, 5e-8
+PVALUE_ABS_ERROR = 2 * T_ABS_ERROR
+
+ALTERNATIVES = ('two-sided', 'less', 'greater')
+
+
+@lru_cache(maxsize=512)
+def _t_table(bucket):
+    # Interpolants of log sf for df = exp(bucket * DF_STEP) on an even grid in
+    # v = log1p(t) / log1p(t_max), as (TABLE_SIZE, 4) polynomial coefficients
+    # in the offset within the interval. log sf is close to linear in log t for
+    # heavy tails, and the shared v grid lets neighbouring buckets be blended
+    # coefficient by coefficient.
+    from scipy import special
+
+    df = np.exp(bucket * DF_STEP)
+    u_max = float(np.log1p(-special.stdtrit(df, TABLE_MIN_SF)))
+    t = np.expm1(np.linspace(0.0, u_max, TABLE_SIZE + 1))
+    log_sf = np.log(special.stdtr(df, -t))
+    log_pdf = (special.gammaln((df + 1) / 2) - special.gammaln(df / 2) - 0.5 * np.log(df * np.pi)
+               - (df + 1) / 2 * np.log1p(t * t / df))
+    slope = -np.exp(log_pdf - log_sf) * (1 + t) * (u_max / TABLE_SIZE)
+    y0, y1, m0, m1 = log_sf[:-1], log_sf[1:], slope[:-1], slope[1:]
+    dy = y1 - y0
+    return u_max, np.stack([y0, m0, 3 * dy - 2 * m0 - m1, m0 + m1 - 2 * dy], axis=1)
+
+
+def _lagrange_weights(frac):
+    # Cubic Lagrange weights for nodes -1, 0, 1, 2 at offset frac in [0, 1)
+    above, below, below2 = frac + 1, frac - 1, frac - 2
+    outer, inner = frac * below, above * below2
+    return [-outer * below2 / 6, inner * below / 2, -inner * frac / 2, outer * above / 6]
+
+
+def _t_neighbours(df):
+    # Lagrange weights and tables of the four buckets around a single df, with
+    # the blended range. It is valid up to where the largest bucket's table
+    # ends, the narrowest of the four.
+    position = np.log(df) / DF_STEP
+    bucket = int(np.floor(position))
+    weights = _lagrange_weights(position - bucket)
+    tables = [_t_table(bucket + offset) for offset in (-1, 0, 1, 2)]
+    u_max = sum(w * table[0] for w, table in zip(weights, tables))
+    return weights, tables, u_max, tables[-1][0]
+
+
+@lru_cache(maxsize=256)
+def _t_blended(df):
+    # One whole table for a single df, for arrays large enough to use most of it
+    weights, tables, u_max, limit = _t_neighbours(df)
+    return u_max, limit, sum(w * table[1] for w, table in zip(weights, tables))
+
+
+@lru_cache(maxsize=4)
+def _t_stack(buckets):
+    # The given buckets stacked, for per-element df: their ranges, and all
+    # their intervals as rows of one (len(buckets) * TABLE_SIZE, 4) array
+    tables = [_t_table(bucket) for bucket in buckets]
+    return np.array([table[0] for table in tables]), np.concatenate([table[1] for table in tables])
+
+
+def _stack_buckets(buckets):
+    # Which base buckets to tabulate, each needing its neighbours -1..2 as
+    # well: the most common first, while the buckets needed stay within
+    # MAX_CALL_TABLES. Returns those buckets (sorted) and the kept bases.
+    bases, counts = np.unique(buckets, return_counts=True)
+    needed, kept = set(), []
+    for base in bases[np.argsort(-counts, kind='stable')].tolist():
+        block = {base - 1, base, base + 1, base + 2} - needed
+        if len(needed) + len(block) <= MAX_CALL_TABLES:
+            needed |= block
+            kept.append(base)
+    return tuple(sorted(needed)), np.array(kept)
+
+
+def _nodes(scaled, fast):
+    # Interval index and offset for positions in grid steps; positions outside
+    # the fast set are parked at 0 so they index safely
+    pos = np.where(fast, scaled, 0.0)
+    i = np.minimum(pos.astype(np.intp), TABLE_SIZE - 1)
+    return i, pos - i
+
+
+def _polyval(coef, frac):
+    return coef[:, 0] + frac * (coef[:, 1] + frac * (coef[:, 2] + frac * coef[:, 3]))
+
+
+def _t_log_sf(t, df):
+    # df is a scalar in [DF_MIN, DF_MAX]. Smaller arrays blend just the rows
+    # they land in, so a df that changes between calls does not pay for (or
+    # cache) a whole blended table.
+    u = np.log1p(t)
+    if t.size > BLEND_ROWS_MAX_SIZE:
+        u_max, limit, coef = _t_blended(df)
+        fast = u < limit
+        i, frac = _nodes(u * (TABLE_SIZE / u_max), fast)
+        return _polyval(np.take(coef, i, axis=0), frac), fast
+    weights, tables, u_max, limit = _t_neighbours(df)
+    fast = u < limit
+    i, frac = _nodes(u * (TABLE_SIZE / u_max), fast)
+    gathered = np.empty((4, t.size, 4))
+    for k, table in enumerate(tables):
+        np.take(table[1], i, axis=0, out=gathered[k])
+    return _polyval(np.einsum('k,knc->nc', np.array(weights), gathered), frac), fast
+
+
+def _t_log_sf_many(t, df):
+    # Per-element df (e.g. Welch): every point blends its own four buckets,
+    # gathered from one stacked array of the buckets in use rather than
+    # looping over them. Points in buckets left out of the stack stay slow.
+    log_sf, fast = np.zeros(t.shape), np.zeros(t.shape, dtype=bool)
+    in_range = np.flatnonzero((df >= DF_MIN) & (df <= DF_MAX))
+    if not in_range.size:
+        return log_sf, fast
+    position = np.log(df[in_range]) / DF_STEP
+    buckets = np.floor(position).astype(np.intp)
+    stacked, kept = _stack_buckets(buckets)
+    usable = np.isin(buckets, kept)
+    # Tables pay off only when they serve most points; with df spread over
+    # more buckets than one call stacks, stdtr alone is faster
+    if 2 * np.count_nonzero(usable) < usable.size:
+        return log_sf, fast
+    selected, position, buckets = in_range[usable], position[usable], buckets[usable]
+    u_maxes, coef = _t_stack(stacked)
+    # Row in the stack of each bucket, looked up by offset from the first
+    first = stacked[0]
+    row_of = np.zeros(stacked[-1] - first + 1, dtype=np.intp)
+    row_of[np.array(stacked) - first] = np.arange(len(stacked))
+    rows = [row_of[buckets + offset - first] for offset in (-1, 0, 1, 2)]
+    weights = _lagrange_weights(position - buckets)
+    u_max = sum(w * u_maxes[row] for w, row in zip(weights, rows))
+    u = np.log1p(t[selected])
+    covered = u < u_maxes[rows[3]]
+    i, frac = _nodes(u * (TABLE_SIZE / u_max), covered)
+    gathered = np.empty((4, selected.size, 4))
+    for k, row in enumerate(rows):
+        np.take(coef, row * TABLE_SIZE + i, axis=0, out=gathered[k])
+    log_sf[selected] = _polyval(np.einsum('kn,knc->nc', np.array(weights), gathered), frac)
+    fast[selected] = covered
+    return log_sf, fast
+
+
+def _upper_tail(x, df):
+    # sf(|x|) elementwise, df None for the normal. t values are tabulated
+    # where sf >= TABLE_MIN_SF and df is in [DF_MIN, DF_MAX], and exact
+    # elsewhere (deep tails, NaN, inf, other df).
+    from scipy import special
+
+    x = np.abs(np.asarray(x, dtype=np.float64))
+    if df is None:
+        return special.ndtr(-x)
+    shape, x = x.shape, x.ravel()
+    if not x.size:
+        return np.empty(shape)
+    if np.ndim(df):
+        df = np.asarray(df, dtype=np.float64).ravel()
+    if x.size <= EXACT_MAX_SIZE:
+        return special.stdtr(df, -x).reshape(shape)
+    with np.errstate(invalid='ignore'):
+        if np.ndim(df):
+            log_sf, fast = _t_log_sf_many(x, df)
+        elif DF_MIN <= df <= DF_MAX:
+            log_sf, fast = _t_log_sf(x, float(df))
+        else:
+            log_sf, fast = np.zeros(x.shape), np.zeros(x.shape, dtype=bool)
+    result = np.exp(log_sf)
+    slow = np.flatnonzero(~fast)
+    if slow.size:
+        result[slow] = special.stdtr(df[slow] if np.ndim(df) else df, -x[slow])
+    return result.reshape(shape)
+
+
+def _sf(x, df):
+    # t sf, or the normal's for df None
+    if df is None:
+        return norm_sf(x)
+    x = np.asarray(x, dtype=np.float64)
+    upper = _upper_tail(x, df)
+    # Below zero sf is the complement of the (small) upper tail
+    result = np.where(x < 0, 1.0 - upper, upper)
+    return result if result.ndim else float(result)
+
+
+def norm_sf(x):
+    from scipy import special
+
+    result = special.ndtr(-np.asarray(x, dtype=np.float64))
+    return result if result.ndim else float(result)
+
+
+def norm_cdf(x):
+    return norm_sf(-np.asarray(x, dtype=np.float64))
+
+
+def t_sf(x, df):
+    # Student-t survival function; df may be a scalar or broadcast against x
+    x = np.asarray(x, dtype=np.float64)
+    if np.ndim(df):
+        x, df = np.broadcast_arrays(x, np.asarray(df, dtype=np.float64))
+    return _sf(x, df)
+
+
+def t_cdf(x, df):
+    return t_sf(-np.asarray(x, dtype=np.float64), df)
+
+
+def pvalue(statistic, df=None, alternative='two-sided'):
+    # p-value of a z (df None) or t statistic, elementwise over arrays of
+    # statistics and, for t, of degrees of freedom
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"alternative must be 'two-sided', 'less' or 'greater', got {alternative}")
+    statistic = np.asarray(statistic, dtype=np.float64)
+    if df is not None and np.ndim(df):
+        statistic, df = np.broadcast_arrays(statistic, np.asarray(df, dtype=np.float64))
+    if alternative == 'two-sided':
+        result = 2 * _upper_tail(statistic, df)
+        return result if result.ndim else float(result)
+    return _sf(statistic if alternative == 'greater' else -statistic, df)
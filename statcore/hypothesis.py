@@ -0,0 +1,22 @@
+import numpy as np
+
+from .batch_tests import batch_t_test, batch_z_test
+
+
+def generate_data(n, mean, std, rng=None):
+    if rng is None:
+        return np.random.normal(mean, std, n)
+    return rng.normal(mean, std, n)
+
+
+def perform_t_test(sample1, sample2):
+    # Pooled-variance t-test, as scipy's ttest_ind; a NaN in either sample
+    # makes the result NaN rather than being skipped
+    statistic, pvalue = batch_t_test(sample1, sample2, mask1=True, mask2=True)
+    return float(statistic[0]), float(pvalue[0])
+
+
+def perform_z_test(sample1, sample2):
+    # As statsmodels' ztest with its defaults (pooled variance, ddof=1)
+    statistic, pvalue = batch_z_test(sample1, sample2, mask1=True, mask2=True)
+    return float(statistic[0]), float(pvalue[0])
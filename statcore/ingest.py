@@ -0,0 +1,215 @@
+import hashlib
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# File extension -> format understood by read_columns
+EXTENSIONS = {
+    '.csv': 'csv', '.txt': 'csv',
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.arrow': 'ipc', '.feather': 'ipc', '.ipc': 'ipc',
+    '.npy': 'npy',
+}
+
+# Bytes per CSV parse block; small blocks keep the reader's buffers, not the
+# file size, as the bound on memory
+CSV_BLOCK_BYTES = 1 << 20
+
+# Spooled uploads not written or reused for this many seconds are removed the
+# next time anything is spooled
+SPOOL_MAX_AGE = 24 * 60 * 60
+
+# Comparison operators accepted in filters, as in pyarrow's DNF filters
+OPERATORS = {
+    '==': np.equal, '!=': np.not_equal,
+    '<': np.less, '<=': np.less_equal,
+    '>': np.greater, '>=': np.greater_equal,
+}
+
+
+def file_format(path):
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {path} (expected one of {', '.join(sorted(EXTENSIONS))})")
+    return EXTENSIONS[ext]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError("Reading CSV, Parquet or Arrow files requires pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def _open_ipc(path):
+    # Memory-maps the file, so columns of an uncompressed IPC file are used in
+    # place and only the pages of the columns actually read are touched
+    pa = _require_pyarrow()
+    import pyarrow.ipc as ipc
+
+    source = pa.memory_map(os.path.abspath(path))
+    try:
+        return ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return ipc.open_stream(source).read_all()
+
+
+def _schema(path, fmt):
+    _require_pyarrow()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path)
+    if fmt == 'ipc':
+        return _open_ipc(path).schema
+    import pyarrow.csv as csv
+
+    # Types are inferred from the first block only
+    with csv.open_csv(path, read_options=csv.ReadOptions(block_size=CSV_BLOCK_BYTES)) as reader:
+        return reader.schema
+
+
+def _npy_names(array):
+    return [str(i) for i in range(1 if array.ndim == 1 else array.shape[1])]
+
+
+def list_columns(path, numeric_only=False):
+    # Column names from the file's schema or header, without reading the data
+    fmt = file_format(path)
+    if fmt == 'npy':
+        return _npy_names(np.load(path, mmap_mode='r'))
+    import pyarrow as pa
+
+    schema = _schema(path, fmt)
+    return [field.name for field in schema
+            if not numeric_only or pa.types.is_integer(field.type) or pa.types.is_floating(field.type)]
+
+
+def _to_numpy(column, dtype=None):
+    # Zero-copy when the column is one null-free chunk of a numeric type and no
+    # cast is needed: the array is then a read-only view of the Arrow buffer
+    # (and, for uncompressed IPC, of the memory-mapped file). Otherwise it is
+    # copied once, with nulls becoming NaN.
+    import pyarrow as pa
+
+    if column.num_chunks == 1 and column.null_count == 0 and (
+            pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+        array = column.chunk(0).to_numpy(zero_copy_only=True)
+    elif column.num_chunks == 0:
+        array = np.empty(0, dtype=column.type.to_pandas_dtype())
+    else:
+        if column.null_count and pa.types.is_integer(column.type):
+            column = column.cast(pa.float64())
+        array = column.to_numpy()
+    if dtype is not None:
+        array = array.astype(dtype, copy=False)
+    return array
+
+
+def _npy_columns(path, columns, filters, dtype):
+    array = np.load(path, mmap_mode='r')
+    names = _npy_names(array)
+    if array.ndim == 1:
+        array = array[:, None]
+
+    def column(name):
+        if name not in names:
+            raise KeyError(f"No column {name!r} in {path}; columns are 0..{len(names) - 1}")
+        return array[:, names.index(name)]
+
+    mask = None
+    for name, op, value in filters or ():
+        keep = OPERATORS[op](column(str(name)), value)
+        mask = keep if mask is None else mask & keep
+    result = {}
+    for name in columns or names:
+        values = column(str(name))
+        # Without a filter this stays a strided view of the mapped file
+        values = values if mask is None else values[mask]
+        result[str(name)] = values if dtype is None else values.astype(dtype, copy=False)
+    return result
+
+
+def read_columns(path, columns=None, filters=None, dtype=None):
+    # Reads only the named columns of a CSV, Parquet, Arrow IPC or .npy file
+    # into a {name: 1-D array} dict. filters is a list of (column, op, value)
+    # conditions that must all hold, e.g. [('group', '==', 'a')]. Parquet
+    # pushes them down to the reader, skipping row groups whose statistics rule
+    # them out; other formats evaluate them on the projected columns only.
+    # .npy columns are named '0', '1', ...; IPC and .npy files are memory-mapped.
+    fmt = file_format(path)
+    for _, op, _ in filters or ():
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator {op!r}; expected one of {', '.join(OPERATORS)}")
+    if fmt == 'npy':
+        return _npy_columns(path, columns, filters, dtype)
+
+    import pyarrow.parquet as pq
+
+    names = list(_schema(path, fmt).names)
+    columns = [str(name) for name in columns] if columns is not None else names
+    missing = [name for name in columns if name not in names]
+    if missing:
+        raise KeyError(f"No column(s) {', '.join(map(repr, missing))} in {path}")
+    expression = pq.filters_to_expression([list(filters)]) if filters else None
+    needed = list(dict.fromkeys(columns + [name for name, _, _ in filters or ()]))
+    if fmt == 'parquet':
+        table = pq.read_table(path, columns=columns, filters=expression, memory_map=True)
+    elif fmt == 'ipc':
+        table = _open_ipc(path).select(needed)
+        if expression is not None:
+            table = table.filter(expression)
+    else:
+        # Streamed block by block, so rows failing the filter never accumulate
+        import pyarrow as pa
+        import pyarrow.csv as csv
+
+        reader = csv.open_csv(path, read_options=csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+                              convert_options=csv.ConvertOptions(include_columns=needed))
+        batches = [batch if expression is None else batch.filter(expression) for batch in reader]
+        table = pa.Table.from_batches(batches, schema=reader.schema)
+    return {name: _to_numpy(table.column(name), dtype) for name in columns}
+
+
+def read_frame(path, columns=None, filters=None, dtype=None):
+    # read_columns as a DataFrame; pandas wraps the arrays without copying
+    import pandas as pd
+
+    return pd.DataFrame(read_columns(path, columns, filters, dtype), copy=False)
+
+
+def _evict_spooled(directory, max_age):
+    # Other processes may be reading or writing the same files, so anything
+    # that vanishes or cannot be removed is skipped
+    cutoff = time.time() - max_age
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def spool_to_disk(name, data, directory=None, max_age=SPOOL_MAX_AGE):
+    # Writes an in-memory upload to a content-addressed file once, so it can be
+    # memory-mapped and re-read like any other path. Returns the path. Reusing
+    # a file refreshes its mtime; files idle for more than max_age seconds are
+    # evicted from the directory on each call.
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    directory = directory or os.path.join(tempfile.gettempdir(), 'statcore-uploads')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, digest + os.path.splitext(name)[1].lower())
+    if os.path.exists(path):
+        os.utime(path)
+    else:
+        partial = f"{path}.{os.getpid()}.part"
+        with open(partial, 'wb') as f:
+            f.write(data)
+        os.replace(partial, path)
+    _evict_spooled(directory, max_age)
+    return path
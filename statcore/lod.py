@@ -0,0 +1,57 @@
+import numpy as np
+
+# Point counts at which scatter plots switch to WebGL, then to server-side binning
+WEBGL_THRESHOLD = 10_000
+DENSITY_THRESHOLD = 200_000
+DEFAULT_BINS = 200
+
+
+def choose_mode(n_points, webgl_threshold=WEBGL_THRESHOLD, density_threshold=DENSITY_THRESHOLD):
+    if n_points > density_threshold:
+        return 'density'
+    if n_points > webgl_threshold:
+        return 'webgl'
+    return 'markers'
+
+
+def visible_mask(x, y, x_range=None, y_range=None):
+    mask = np.ones(np.shape(x), dtype=bool)
+    if x_range is not None:
+        mask &= (x >= x_range[0]) & (x <= x_range[1])
+    if y_range is not None:
+        mask &= (y >= y_range[0]) & (y <= y_range[1])
+    return mask
+
+
+def bin_points(x, y, bins=DEFAULT_BINS, x_range=None, y_range=None, values=None):
+    # Rasterizes points onto a bins x bins grid over the visible window, in the
+    # spirit of datashader. Returns (grid, x_centers, y_centers) where grid[i, j]
+    # is the point count, or the mean of values, in row i (y) and column j (x);
+    # empty cells are NaN so they render transparent.
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x_range is None:
+        x_range = (x.min(), x.max()) if x.size else (0.0, 1.0)
+    if y_range is None:
+        y_range = (y.min(), y.max()) if y.size else (0.0, 1.0)
+    mask = visible_mask(x, y, x_range, y_range)
+    x, y = x[mask], y[mask]
+
+    x_edges = np.linspace(x_range[0], x_range[1], bins + 1)
+    y_edges = np.linspace(y_range[0], y_range[1], bins + 1)
+    x_width = (x_range[1] - x_range[0]) or 1.0
+    y_width = (y_range[1] - y_range[0]) or 1.0
+    col = np.minimum(((x - x_range[0]) / x_width * bins).astype(np.intp), bins - 1)
+    row = np.minimum(((y - y_range[0]) / y_width * bins).astype(np.intp), bins - 1)
+    flat = row * bins + col
+
+    counts = np.bincount(flat, minlength=bins * bins).astype(np.float64)
+    if values is None:
+        grid = counts
+    else:
+        sums = np.bincount(flat, weights=np.asarray(values, dtype=np.float64)[mask], minlength=bins * bins)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            grid = sums / counts
+    grid[counts == 0] = np.nan
+    return (grid.reshape(bins, bins), 0.5 * (x_edges[:-1] + x_edges[1:]),
+            0.5 * (y_edges[:-1] + y_edges[1:]))
@@ -0,0 +1,22 @@
+import numpy as np
+
+
+def generate_data(seed=None, n=100):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)  # A seed of None gives different data each time
+    x = rng.integers(0, 100, n)
+    y = rng.integers(0, 100, n)
+    return pd.DataFrame({'x': x, 'y': y})
+
+
+def normalize_data(data, scaler=None):
+    import pandas as pd
+
+    # A pre-fitted streaming scaler is applied as-is instead of refitting
+    if scaler is None:
+        from sklearn.preprocessing import StandardScaler
+        normalized_data = StandardScaler().fit_transform(data)
+    else:
+        normalized_data = scaler.transform(data)
+    return pd.DataFrame(normalized_data, columns=['x', 'y'])
@@ -0,0 +1,121 @@
+import numpy as np
+
+# Minkowski order for each named metric
+METRIC_P = {
+    'Euclidean': 2.0,
+    'Manhattan': 1.0,
+    'Chebyshev': np.inf,
+}
+
+FORMULAS = {
+    'Euclidean': "√(Σ(x_i - y_i)²)",
+    'Manhattan': "Σ|x_i - y_i|",
+    'Chebyshev': "max(|x_i - y_i|)",
+    'Minkowski': "(Σ|x_i - y_i|^p)^(1/p)",
+}
+
+# Upper bound on the scratch memory used by a single row block
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+# The ||x||² + ||y||² - 2x·y expansion turns Euclidean distances into a
+# matrix product, but cancels badly for nearby points. It is only used when
+# it pays off: at least this many dimensions, and at least this many rows on
+# both sides (with one row on either side the direct difference costs the
+# same O(N·D) and is exact).
+GRAM_MIN_DIM = 16
+GRAM_MIN_ROWS = 16
+
+
+def resolve_p(metric, p=None):
+    if metric == 'Minkowski':
+        if p is None:
+            raise ValueError("Minkowski metric requires p")
+        p = float(p)
+        if p < 1:
+            raise ValueError(f"Minkowski p must be >= 1, got {p}")
+        return p
+    if metric not in METRIC_P:
+        raise ValueError(f"Unknown metric: {metric}")
+    return METRIC_P[metric]
+
+
+def _euclidean_gram(xb, Y, y_sq, out):
+    np.matmul(xb, Y.T, out=out)
+    out *= -2
+    out += np.einsum('ij,ij->i', xb, xb)[:, None]
+    out += y_sq[None, :]
+    np.maximum(out, 0, out=out)
+    np.sqrt(out, out=out)
+
+
+def _minkowski_diff(xb, Y, p, out):
+    # One (rows, cols, D) scratch array; abs and powers are taken in place
+    diff = xb[:, None, :] - Y[None, :, :]
+    np.abs(diff, out=diff)
+    if p == 1:
+        np.sum(diff, axis=2, out=out)
+    elif p == 2:
+        np.sqrt(np.einsum('ijk,ijk->ij', diff, diff), out=out)
+    elif np.isinf(p):
+        np.max(diff, axis=2, out=out)
+    else:
+        np.power(diff, p, out=diff)
+        np.power(np.sum(diff, axis=2), 1.0 / p, out=out)
+
+
+def _use_gram(n, m, d, p):
+    return p == 2 and d >= GRAM_MIN_DIM and min(n, m) >= GRAM_MIN_ROWS
+
+
+def _block_shape(m, d, itemsize, use_gram, max_block_bytes):
+    # (rows, cols) of one block. The Gram path only needs a row of the output
+    # per X row; the difference path materializes rows * cols * D values, so
+    # it blocks over Y as well once a single X row against all of Y is over
+    # budget.
+    if use_gram:
+        return max(1, int(max_block_bytes // max(m * itemsize, 1))), m
+    pair_bytes = max(d, 1) * itemsize
+    cols = min(m, max(1, int(max_block_bytes // pair_bytes)))
+    return max(1, int(max_block_bytes // (cols * pair_bytes))), cols
+
+
+def pairwise_distances(X, Y, metric='Euclidean', p=None, dtype=np.float64, out=None,
+                       max_block_bytes=DEFAULT_BLOCK_BYTES):
+    from .sparse_distance import is_sparse, sparse_pairwise_distances
+
+    if is_sparse(X) or is_sparse(Y):
+        return sparse_pairwise_distances(X, Y, metric, dtype, out, max_block_bytes)
+
+    p = resolve_p(metric, p)
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"dtype must be float32 or float64, got {dtype}")
+
+    X = np.ascontiguousarray(np.atleast_2d(X), dtype=dtype)
+    Y = np.ascontiguousarray(np.atleast_2d(Y), dtype=dtype)
+    if X.ndim != 2 or Y.ndim != 2:
+        raise ValueError("X and Y must be 2-D arrays of shape (N, D) and (M, D)")
+    if X.shape[1] != Y.shape[1]:
+        raise ValueError(f"Dimension mismatch: X has {X.shape[1]} columns, Y has {Y.shape[1]}")
+
+    n, d = X.shape
+    m = Y.shape[0]
+    if out is None:
+        out = np.empty((n, m), dtype=dtype)
+    elif out.shape != (n, m) or out.dtype != dtype:
+        raise ValueError(f"out must have shape {(n, m)} and dtype {dtype}, "
+                         f"got {out.shape} and {out.dtype}")
+
+    use_gram = _use_gram(n, m, d, p)
+    y_sq = np.einsum('ij,ij->i', Y, Y) if use_gram else None
+    rows, cols = _block_shape(m, d, dtype.itemsize, use_gram, max_block_bytes)
+
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        if use_gram:
+            _euclidean_gram(X[start:stop], Y, y_sq, out[start:stop])
+            continue
+        for first in range(0, m, cols):
+            last = min(first + cols, m)
+            _minkowski_diff(X[start:stop], Y[first:last], p, out[start:stop, first:last])
+    return out
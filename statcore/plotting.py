@@ -0,0 +1,44 @@
+# Plotly helpers for the apps. This is the only statcore module that touches
+# plotly, and only inside functions; headless code never needs to import it.
+import json
+
+import numpy as np
+
+from .lod import DEFAULT_BINS, DENSITY_THRESHOLD, WEBGL_THRESHOLD, bin_points, choose_mode, visible_mask
+
+
+def scatter_trace(x, y, name=None, marker=None, x_range=None, y_range=None, values=None,
+                  webgl_threshold=WEBGL_THRESHOLD, density_threshold=DENSITY_THRESHOLD, bins=DEFAULT_BINS):
+    # Level-of-detail scatter: SVG markers for small inputs, Scattergl above
+    # webgl_threshold visible points and a server-side binned Heatmap above
+    # density_threshold. Only points inside x_range/y_range are considered,
+    # so zooming in re-aggregates at a finer level. values, if given, colour
+    # the markers or are averaged per cell. Returns (trace, mode).
+    import plotly.graph_objects as go
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    mask = visible_mask(x, y, x_range, y_range)
+    mode = choose_mode(int(np.count_nonzero(mask)), webgl_threshold, density_threshold)
+
+    if mode == 'density':
+        grid, x_centers, y_centers = bin_points(x, y, bins, x_range, y_range, values)
+        trace = go.Heatmap(z=grid.astype(np.float32), x=x_centers, y=y_centers, name=name, showscale=values is not None,
+                           colorscale='Viridis', hoverongaps=False)
+        return trace, mode
+
+    marker = dict(marker or {})
+    if values is not None:
+        marker.update(color=np.asarray(values, dtype=np.float32)[mask], colorscale='Viridis', showscale=True)
+    trace_cls = go.Scattergl if mode == 'webgl' else go.Scatter
+    # float32 halves the payload and is ample precision for screen coordinates
+    return trace_cls(x=x[mask].astype(np.float32), y=y[mask].astype(np.float32), mode='markers', name=name,
+                     marker=marker), mode
+
+
+def payload_bytes(figure):
+    # Size of the JSON that is sent to the browser for a figure or figure spec
+    from plotly.utils import PlotlyJSONEncoder
+
+    spec = figure if isinstance(figure, dict) else figure.to_dict()
+    return len(json.dumps(spec, cls=PlotlyJSONEncoder))
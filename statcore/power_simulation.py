@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .batch_tests import batch_t_test, batch_z_test
+
+TESTS = {
+    't-test': batch_t_test,
+    'z-test': batch_z_test,
+}
+
+# Upper bound on the number of draws held in one (replicates x n) block
+MAX_BLOCK_ELEMENTS = 4_000_000
+
+
+def _simulate_cell(task):
+    # Runs the replicates of one (n, effect size) cell as (replicates x n) matrices,
+    # the vectorized counterpart of generate_data + perform_t_test/perform_z_test
+    n, effect, std, test, alpha, replicates, seed = task
+    rng = np.random.default_rng(seed)
+    run_test = TESTS[test]
+    block = max(1, MAX_BLOCK_ELEMENTS // (2 * n))
+    rejections = 0
+    done = 0
+    while done < replicates:
+        size = min(block, replicates - done)
+        sample1 = rng.normal(0.0, std, (size, n))
+        sample2 = rng.normal(effect * std, std, (size, n))
+        _, pvalue = run_test(sample1, sample2)
+        rejections += int(np.count_nonzero(pvalue < alpha))
+        done += size
+    return rejections
+
+
+def simulate_power(sample_sizes, effect_sizes, test='t-test', replicates=1000, alpha=0.05, std=1.0,
+                   seed=None, max_workers=None):
+    # Empirical rejection rates over a grid of sample sizes and effect sizes
+    # (difference in means in units of std, so 0.5 is half a standard deviation
+    # whatever std is). Each cell gets its own child
+    # of one SeedSequence, so results do not depend on how cells are scheduled.
+    # A null cell (effect 0) is always run per sample size to report the
+    # false-positive rate alongside the power.
+    if test not in TESTS:
+        raise ValueError(f"test must be one of {list(TESTS)}, got {test}")
+    sample_sizes = [int(n) for n in sample_sizes]
+    effect_sizes = [float(e) for e in effect_sizes]
+    if min(sample_sizes) < 2:
+        raise ValueError("sample sizes must be at least 2")
+
+    cells = [(n, e) for n in sample_sizes for e in [0.0] + effect_sizes]
+    seeds = np.random.SeedSequence(seed).spawn(len(cells))
+    tasks = [(n, e, std, test, alpha, replicates, s) for (n, e), s in zip(cells, seeds)]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1:
+        counts = [_simulate_cell(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            counts = list(pool.map(_simulate_cell, tasks))
+
+    rates = np.asarray(counts, dtype=np.float64).reshape(len(sample_sizes), len(effect_sizes) + 1)
+    rates /= replicates
+    return {
+        'sample_sizes': np.asarray(sample_sizes),
+        'effect_sizes': np.asarray(effect_sizes),
+        'power': rates[:, 1:],
+        'false_positive_rate': rates[:, 0],
+        'replicates': replicates,
+        'alpha': alpha,
+    }
@@ -0,0 +1,108 @@
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Histogram buckets: 8 per decade from 1 µs to 100 s, plus an overflow bucket
+BUCKET_BOUNDS = np.logspace(-6, 2, 8 * 8 + 1)
+
+
+class LatencyRecorder:
+    # Per-name latency histograms for functions running inside an app. It is
+    # off unless enabled explicitly or STATCORE_PROFILE=1 is set, and then the
+    # wrapped call pays for one attribute check.
+    def __init__(self, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get('STATCORE_PROFILE', '') not in ('', '0')
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def record(self, name, seconds):
+        bucket = int(np.searchsorted(BUCKET_BOUNDS, seconds, side='right'))
+        with self._lock:
+            entry = self._histograms.get(name)
+            if entry is None:
+                entry = self._histograms[name] = {'counts': np.zeros(BUCKET_BOUNDS.size + 1, dtype=np.int64),
+                                                  'count': 0, 'total': 0.0, 'max': 0.0}
+            entry['counts'][bucket] += 1
+            entry['count'] += 1
+            entry['total'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    @staticmethod
+    def _percentile(counts, total, q):
+        # Upper bound of the bucket holding the q-th percentile
+        rank = math.ceil(q / 100.0 * total)
+        bucket = int(np.searchsorted(np.cumsum(counts), rank))
+        return float(BUCKET_BOUNDS[min(bucket, BUCKET_BOUNDS.size - 1)])
+
+    def summary(self):
+        # {name: {count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}}; percentiles
+        # are histogram bucket bounds, so accurate to about 33%
+        with self._lock:
+            entries = {name: dict(entry, counts=entry['counts'].copy()) for name, entry in self._histograms.items()}
+        result = {}
+        for name, entry in entries.items():
+            result[name] = {'count': entry['count'], 'mean_ms': 1000 * entry['total'] / entry['count']}
+            for q in (50, 90, 99):
+                bound = self._percentile(entry['counts'], entry['count'], q)
+                result[name][f'p{q}_ms'] = 1000 * min(bound, entry['max'])
+            result[name]['max_ms'] = 1000 * entry['max']
+        return result
+
+    def histogram(self, name):
+        # (bucket upper bounds in seconds, counts); the last bucket is open-ended
+        with self._lock:
+            counts = self._histograms[name]['counts'].copy()
+        return np.append(BUCKET_BOUNDS, np.inf), counts
+
+
+default_recorder = LatencyRecorder()
+
+
+def profiled(func=None, name=None, recorder=None):
+    # Decorator recording the latency of every call while profiling is enabled
+    if func is None:
+        return functools.partial(profiled, name=name, recorder=recorder)
+    target = recorder if recorder is not None else default_recorder
+    label = name or f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not target.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            target.record(label, time.perf_counter() - start)
+
+    return wrapper
+
+
+@contextmanager
+def profile_block(name, recorder=None):
+    target = recorder if recorder is not None else default_recorder
+    if not target.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        target.record(name, time.perf_counter() - start)
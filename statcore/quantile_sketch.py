@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+
+# Shrink factor between the capacities of adjacent compactor levels
+CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    # KLL quantile sketch (Karnin, Lang & Liberty, 2016) over one stream of
+    # floats. Items live in compactors; level h items stand for 2**h inputs.
+    # When a level overflows it is sorted and every other item (random offset)
+    # is promoted. Size is O(k) and the rank error of any quantile is about
+    # `error` with high probability (k = 2/error). Sketches built on separate
+    # shards merge into the sketch of the concatenated stream.
+    def __init__(self, error=0.01, seed=None):
+        if not 0 < error < 1:
+            raise ValueError(f"error must be in (0, 1), got {error}")
+        self.error = error
+        self.k = max(8, int(math.ceil(2.0 / error)))
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if self.levels[level].size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[level])
+                # An odd item out stays behind so weights are preserved exactly
+                if items.size % 2:
+                    self.levels[level], items = items[-1:], items[:-1]
+                else:
+                    self.levels[level] = np.empty(0)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # Lower levels may now be over their (shrunken) capacity
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    @property
+    def size(self):
+        return sum(items.size for items in self.levels)
+
+    def quantile(self, q):
+        q = np.asarray(q, dtype=np.float64)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        result = items[np.clip(idx, 0, items.size - 1)]
+        # The extremes are tracked exactly
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return result
+
+    def to_dict(self):
+        return {'error': self.error, 'k': self.k, 'n': self.n, 'min': self.min, 'max': self.max,
+                'levels': [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state, seed=None):
+        sketch = cls(state['error'], seed)
+        sketch.k = int(state['k'])
+        sketch.n = int(state['n'])
+        sketch.min = float(state['min'])
+        sketch.max = float(state['max'])
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in state['levels']]
+        return sketch
@@ -0,0 +1,164 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .executor import report_progress
+
+# Upper bound on the number of indices held in one (resamples x n) block
+MAX_BLOCK_ELEMENTS = 2_000_000
+
+# Resamples are split into at least this many blocks per worker, so that small
+# samples still spread across workers and early stopping has points to act on
+BLOCKS_PER_WORKER = 8
+
+# Relative tolerance when comparing resampled statistics with the observed one,
+# so that ties lost to floating-point rounding still count as extreme
+TIE_TOLERANCE = 1e-9
+
+
+def _row_statistic(values, statistic):
+    if statistic == 'mean':
+        return values.mean(axis=-1)
+    if statistic == 'median':
+        return np.median(values, axis=-1)
+    raise ValueError(f"statistic must be 'mean' or 'median', got {statistic}")
+
+
+def _count_extreme(diffs, observed, alternative):
+    tol = TIE_TOLERANCE * max(abs(observed), 1.0)
+    if alternative == 'two-sided':
+        return int(np.count_nonzero(np.abs(diffs) >= abs(observed) - tol))
+    if alternative == 'greater':
+        return int(np.count_nonzero(diffs >= observed - tol))
+    if alternative == 'less':
+        return int(np.count_nonzero(diffs <= observed + tol))
+    raise ValueError(f"alternative must be 'two-sided', 'less' or 'greater', got {alternative}")
+
+
+def _block_rows(n, n_resamples=None, max_workers=1):
+    rows = max(1, MAX_BLOCK_ELEMENTS // max(n, 1))
+    if n_resamples is None:
+        return rows
+    return min(rows, max(1, math.ceil(n_resamples / (max_workers * BLOCKS_PER_WORKER))))
+
+
+def _block_sizes(n, n_resamples, max_workers):
+    block = _block_rows(n, n_resamples, max_workers)
+    return [min(block, n_resamples - start) for start in range(0, n_resamples, block)]
+
+
+def _permutation_block(task):
+    # Extreme-count for one block of random relabellings of the pooled sample
+    pooled, n1, statistic, observed, alternative, size, seed = task
+    rng = np.random.default_rng(seed)
+    perms = rng.permuted(np.broadcast_to(np.arange(pooled.size), (size, pooled.size)), axis=1)
+    resampled = pooled[perms]
+    diffs = _row_statistic(resampled[:, :n1], statistic) - _row_statistic(resampled[:, n1:], statistic)
+    return _count_extreme(diffs, observed, alternative)
+
+
+def _exact_permutation_count(pooled, n1, statistic, observed, alternative):
+    # Enumerates every split of the pooled sample into groups of n1 and n2
+    n = pooled.size
+    block = _block_rows(n)
+    combos = itertools.combinations(range(n), n1)
+    count = total = 0
+    while True:
+        chunk = np.array(list(itertools.islice(combos, block)), dtype=np.intp)
+        if chunk.size == 0:
+            return count, total
+        mask = np.zeros((chunk.shape[0], n), dtype=bool)
+        np.put_along_axis(mask, chunk, True, axis=1)
+        tiled = np.broadcast_to(pooled, mask.shape)
+        group1 = tiled[mask].reshape(chunk.shape[0], n1)
+        group2 = tiled[~mask].reshape(chunk.shape[0], n - n1)
+        diffs = _row_statistic(group1, statistic) - _row_statistic(group2, statistic)
+        count += _count_extreme(diffs, observed, alternative)
+        total += chunk.shape[0]
+
+
+def permutation_test(sample1, sample2, statistic='mean', n_resamples=10_000, alternative='two-sided',
+                     target_error=None, seed=None, max_workers=1):
+    # Permutation test for a difference in means or medians. When the number of
+    # distinct splits is at most n_resamples they are all enumerated and the
+    # p-value is exact. Otherwise random relabellings are drawn in blocks (at
+    # least BLOCKS_PER_WORKER per worker, one wave of max_workers at a time),
+    # and sampling stops early once the Monte Carlo standard error of the p-value
+    # drops below target_error.
+    sample1 = np.asarray(sample1, dtype=np.float64).ravel()
+    sample2 = np.asarray(sample2, dtype=np.float64).ravel()
+    pooled = np.concatenate([sample1, sample2])
+    n1 = sample1.size
+    observed = float(_row_statistic(sample1, statistic) - _row_statistic(sample2, statistic))
+
+    if math.comb(pooled.size, n1) <= n_resamples:
+        count, total = _exact_permutation_count(pooled, n1, statistic, observed, alternative)
+        return {'statistic': observed, 'pvalue': count / total, 'n_resamples': total,
+                'mc_error': 0.0, 'exact': True}
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    sizes = _block_sizes(pooled.size, n_resamples, max_workers)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(pooled, n1, statistic, observed, alternative, size, s) for size, s in zip(sizes, seeds)]
+
+    count = done = 0
+    pvalue = mc_error = 1.0
+    pool = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        for start in range(0, len(tasks), max_workers):
+            wave = tasks[start:start + max_workers]
+            counts = pool.map(_permutation_block, wave) if pool else map(_permutation_block, wave)
+            count += sum(counts)
+            done += sum(task[5] for task in wave)
+            # Add-one estimator keeps the p-value away from zero
+            pvalue = (count + 1) / (done + 1)
+            mc_error = math.sqrt(pvalue * (1 - pvalue) / done)
+            report_progress(done / n_resamples, f"{done} permutations")
+            if target_error is not None and mc_error < target_error:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return {'statistic': observed, 'pvalue': pvalue, 'n_resamples': done,
+            'mc_error': mc_error, 'exact': False}
+
+
+def _bootstrap_block(task):
+    sample1, sample2, statistic, size, seed = task
+    rng = np.random.default_rng(seed)
+    idx1 = rng.integers(0, sample1.size, (size, sample1.size))
+    idx2 = rng.integers(0, sample2.size, (size, sample2.size))
+    return _row_statistic(sample1[idx1], statistic) - _row_statistic(sample2[idx2], statistic)
+
+
+def bootstrap_ci(sample1, sample2, statistic='mean', n_resamples=10_000, confidence=0.95, seed=None,
+                 max_workers=1):
+    # Percentile bootstrap confidence interval for the difference in means or medians
+    sample1 = np.asarray(sample1, dtype=np.float64).ravel()
+    sample2 = np.asarray(sample2, dtype=np.float64).ravel()
+    estimate = float(_row_statistic(sample1, statistic) - _row_statistic(sample2, statistic))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    sizes = _block_sizes(sample1.size + sample2.size, n_resamples, max_workers)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(sample1, sample2, statistic, size, s) for size, s in zip(sizes, seeds)]
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            diffs = np.concatenate(list(pool.map(_bootstrap_block, tasks)))
+    else:
+        blocks, done = [], 0
+        for task in tasks:
+            blocks.append(_bootstrap_block(task))
+            done += task[3]
+            report_progress(done / n_resamples, f"{done} resamples")
+        diffs = np.concatenate(blocks)
+
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(diffs, [tail, 1 - tail])
+    return {'estimate': estimate, 'low': float(low), 'high': float(high),
+            'confidence': confidence, 'n_resamples': n_resamples}
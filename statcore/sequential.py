@@ -0,0 +1,90 @@
+import numpy as np
+
+from .batch_tests import batch_moments
+
+
+def _merge(n, mean, m2, batch_n, batch_mean, batch_m2):
+    # Chan et al.'s parallel update, vectorized over experiments
+    total = n + batch_n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = batch_mean - mean
+        weight = np.where(total > 0, batch_n / total, 0.0)
+        new_mean = np.where(batch_n > 0, mean + delta * weight, mean)
+        new_m2 = np.where(batch_n > 0, m2 + batch_m2 + delta ** 2 * n * weight, m2)
+    return total, new_mean, new_m2
+
+
+class SequentialTest:
+    # Mixture sequential probability ratio test (mSPRT; Johari et al., 2017)
+    # for a difference in means between two arms, run over many experiments at
+    # once. The effect is given a N(0, tau²) mixing prior in units of the pooled
+    # standard deviation, and the always-valid p-value is the running minimum of
+    # 1 / likelihood ratio. It can be checked after every micro-batch without
+    # inflating the false-positive rate, and an experiment stops once it drops
+    # below alpha. State is a handful of floats per experiment, and each update
+    # costs O(batch size).
+    def __init__(self, n_experiments=1, alpha=0.05, tau=0.2, min_samples=10):
+        if not 0 < alpha < 1:
+            raise ValueError(f"alpha must be in (0, 1), got {alpha}")
+        if tau <= 0:
+            raise ValueError(f"tau must be positive, got {tau}")
+        self.alpha = alpha
+        self.tau = tau
+        self.min_samples = min_samples
+        shape = (n_experiments,)
+        self.n1, self.mean1, self.m2_1 = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        self.n2, self.mean2, self.m2_2 = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        self.pvalue = np.ones(shape)
+        self.stopped = np.zeros(shape, dtype=bool)
+        self.stop_n = np.zeros(shape, dtype=np.int64)
+
+    @property
+    def n_experiments(self):
+        return self.pvalue.shape[0]
+
+    def update(self, values1, values2, mask1=None, mask2=None, index=None):
+        # values1/values2 are (experiments, batch) arrays of new observations for
+        # each arm (1-D for a single experiment); NaN or mask False marks padding.
+        # index selects which experiments the rows belong to (default: all).
+        # Returns a boolean array of experiments that stopped on this batch.
+        if index is None:
+            index = np.arange(self.n_experiments)
+        index = np.atleast_1d(index)
+        for arm, values, mask in ((1, values1, mask1), (2, values2, mask2)):
+            batch_n, batch_mean, batch_var = batch_moments(values, mask)
+            if batch_n.shape != index.shape:
+                raise ValueError(f"Got {batch_n.shape[0]} rows for {index.shape[0]} experiments")
+            batch_m2 = np.where(batch_n > 1, batch_var * (batch_n - 1), 0.0)
+            batch_mean = np.where(batch_n > 0, batch_mean, 0.0)
+            n, mean, m2 = (getattr(self, name)[index] for name in (f'n{arm}', f'mean{arm}', f'm2_{arm}'))
+            n, mean, m2 = _merge(n, mean, m2, batch_n, batch_mean, batch_m2)
+            getattr(self, f'n{arm}')[index] = n
+            getattr(self, f'mean{arm}')[index] = mean
+            getattr(self, f'm2_{arm}')[index] = m2
+
+        pvalue = np.minimum(self.pvalue[index], self._mixture_pvalue(index))
+        self.pvalue[index] = pvalue
+        newly_stopped = (pvalue < self.alpha) & ~self.stopped[index]
+        stopped_ids = index[newly_stopped]
+        self.stopped[stopped_ids] = True
+        self.stop_n[stopped_ids] = (self.n1[stopped_ids] + self.n2[stopped_ids]).astype(np.int64)
+        result = np.zeros(self.n_experiments, dtype=bool)
+        result[stopped_ids] = True
+        return result
+
+    def _mixture_pvalue(self, index):
+        n1, n2 = self.n1[index], self.n2[index]
+        ready = (n1 >= self.min_samples) & (n2 >= self.min_samples)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pooled_var = (self.m2_1[index] + self.m2_2[index]) / (n1 + n2 - 2)
+            ready &= pooled_var > 0
+            effect = (self.mean1[index] - self.mean2[index]) / np.sqrt(pooled_var)
+            v = 1.0 / n1 + 1.0 / n2
+            tau2 = self.tau ** 2
+            log_lr = 0.5 * np.log(v / (v + tau2)) + tau2 * effect ** 2 / (2 * v * (v + tau2))
+            pvalue = np.minimum(1.0, np.exp(-log_lr))
+        return np.where(ready, pvalue, 1.0)
+
+    def estimates(self):
+        # Current difference in means and the always-valid p-values
+        return self.mean1 - self.mean2, self.pvalue.copy()
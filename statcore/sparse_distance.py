@@ -0,0 +1,197 @@
+import sys
+
+import numpy as np
+
+from .pairwise import DEFAULT_BLOCK_BYTES, GRAM_MIN_ROWS, resolve_p
+
+# Scratch bytes per intersecting (x, y) entry pair: row, column, flat index and values
+PAIR_BYTES = 48
+
+
+def is_sparse(x):
+    # A scipy sparse matrix can only exist once scipy.sparse has been imported,
+    # so dense callers never pay for the import
+    module = sys.modules.get('scipy.sparse')
+    return module is not None and module.issparse(x)
+
+
+def as_csr(x, dtype=np.float64):
+    # Canonical CSR rows (sorted, no duplicates) without densifying; 1-D
+    # sparse arrays and dense input become a single row
+    import scipy.sparse as sp
+
+    if not is_sparse(x):
+        x = np.atleast_2d(np.asarray(x, dtype=dtype))
+    elif x.ndim == 1:
+        x = x.reshape(1, -1)
+    x = sp.csr_array(x, dtype=dtype)
+    if not x.has_canonical_format:
+        x = x.copy()
+        x.sum_duplicates()
+    return x
+
+
+def row_norms(X, metric='Euclidean'):
+    # Squared L2 norms for Euclidean, L1 norms for Manhattan; O(nnz)
+    rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+    values = X.data ** 2 if metric == 'Euclidean' else np.abs(X.data)
+    return np.bincount(rows, weights=values, minlength=X.shape[0])
+
+
+def _row_blocks(X, col_counts, m, max_block_bytes):
+    # Splits X's rows so each block's shared (x, y) entry pairs and per-pair
+    # scratch fit the budget
+    rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+    cost = np.bincount(rows, weights=col_counts[X.indices], minlength=X.shape[0]) + m
+    budget = max(1, max_block_bytes // PAIR_BYTES)
+    start, total = 0, 0
+    for row, count in enumerate(cost):
+        if total and total + count > budget:
+            yield start, row
+            start, total = row, 0
+        total += count
+    if start < X.shape[0]:
+        yield start, X.shape[0]
+
+
+def _shared_entries(X, start, stop, Yc):
+    # Every (x row, y row) pair with a non-zero in the same column, together
+    # with both values: a join of X's entries against Y's columns, so the work
+    # is the number of shared non-zeros rather than the dimensionality
+    lo, hi = X.indptr[start], X.indptr[stop]
+    cols, x_values = X.indices[lo:hi], X.data[lo:hi]
+    rows = np.repeat(np.arange(stop - start), np.diff(X.indptr[start:stop + 1]))
+    counts = np.diff(Yc.indptr)[cols]
+    owner = np.repeat(np.arange(cols.size), counts)
+    first = np.cumsum(counts) - counts
+    pos = Yc.indptr[cols][owner] + np.arange(owner.size) - first[owner]
+    return rows[owner], Yc.indices[pos], x_values[owner], Yc.data[pos]
+
+
+def _by_magnitude(A):
+    # A's columns and |values| with each row's entries in decreasing |value|
+    order = np.lexsort((-np.abs(A.data), np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))))
+    return A.indptr, A.indices[order], np.abs(A.data[order])
+
+
+def _row_keys(B):
+    # Sorted row * D + column keys for membership tests
+    rows = np.repeat(np.arange(B.shape[0], dtype=np.int64), np.diff(B.indptr))
+    return rows * B.shape[1] + B.indices
+
+
+def _max_unshared(a_sorted, a_rows, b_keys, b_count, d):
+    # max |a_i| over the non-zeros of each A row whose column is empty in each
+    # B row. Rows are walked in decreasing |a_i| order until a column missing
+    # from the B row turns up, which takes one step unless the largest entries
+    # are shared.
+    indptr, cols, values = a_sorted
+    result = np.zeros(a_rows.size * b_count)
+    ptr = np.repeat(indptr[a_rows], b_count)
+    end = np.repeat(indptr[a_rows + 1], b_count)
+    b_row = np.tile(np.arange(b_count, dtype=np.int64), a_rows.size)
+    active = np.flatnonzero(ptr < end)
+    while active.size:
+        keys = b_row[active] * d + cols[ptr[active]]
+        found = np.minimum(np.searchsorted(b_keys, keys), max(b_keys.size - 1, 0))
+        shared = b_keys[found] == keys if b_keys.size else np.zeros(keys.size, dtype=bool)
+        done = active[~shared]
+        result[done] = values[ptr[done]]
+        active = active[shared]
+        ptr[active] += 1
+        active = active[ptr[active] < end[active]]
+    return result.reshape(a_rows.size, b_count)
+
+
+def _subtracted_norms(X, Y, metric, out, max_block_bytes):
+    # Exact Euclidean or Manhattan distances by CSR row subtraction: each X row
+    # is repeated against a block of Y rows and subtracted, so the work is
+    # O(nnz) per pair and nothing cancels. Used when one side has few rows,
+    # where the norm expansions cost the same and lose nearby points.
+    import scipy.sparse as sp
+
+    if X.shape[0] > Y.shape[0]:
+        _subtracted_norms(Y, X, metric, out.T, max_block_bytes)
+        return out
+    m = Y.shape[0]
+    for i in range(X.shape[0]):
+        lo, hi = X.indptr[i], X.indptr[i + 1]
+        nnz = hi - lo
+        step = max(1, int(max_block_bytes // (PAIR_BYTES * max(nnz, 1))))
+        for first in range(0, m, step):
+            last = min(first + step, m)
+            repeated = sp.csr_array((np.tile(X.data[lo:hi], last - first), np.tile(X.indices[lo:hi], last - first),
+                                     np.arange(last - first + 1) * nnz), shape=(last - first, X.shape[1]))
+            diff = Y[first:last] - repeated
+            norms = row_norms(diff, metric)
+            out[i, first:last] = np.sqrt(norms) if metric == 'Euclidean' else norms
+    return out
+
+
+def sparse_pairwise_distances(X, Y, metric='Euclidean', dtype=np.float64, out=None,
+                              max_block_bytes=DEFAULT_BLOCK_BYTES, y_norms=None):
+    # Euclidean, Manhattan and Chebyshev distances between the rows of two CSR
+    # matrices (dense input is converted to CSR). Nothing is densified except
+    # the (N, M) result:
+    #   Euclidean  sqrt(|x|² + |y|² - 2 x·y) with precomputed squared row norms
+    #              and a sparse product; y_norms may pass Y's norms in when the
+    #              same Y is queried repeatedly.
+    #   Manhattan  |x|₁ + |y|₁ corrected on the shared non-zeros only.
+    #   Chebyshev  max of the shared |x_i - y_i| and the largest entries of
+    #              either row missing from the other.
+    # As for dense input, Euclidean and Manhattan subtract the rows exactly
+    # instead when either side has fewer than GRAM_MIN_ROWS rows.
+    # Time and scratch memory grow with nnz and shared non-zeros, not with D.
+    if metric not in ('Euclidean', 'Manhattan', 'Chebyshev'):
+        raise ValueError(f"Sparse input supports Euclidean, Manhattan and Chebyshev, got {metric}")
+    p = resolve_p(metric)
+    dtype = np.dtype(dtype)
+    X, Y = as_csr(X, dtype), as_csr(Y, dtype)
+    if X.shape[1] != Y.shape[1]:
+        raise ValueError(f"Dimension mismatch: X has {X.shape[1]} columns, Y has {Y.shape[1]}")
+
+    n, m = X.shape[0], Y.shape[0]
+    if out is None:
+        out = np.empty((n, m), dtype=dtype)
+    elif out.shape != (n, m) or out.dtype != dtype:
+        raise ValueError(f"out must have shape {(n, m)} and dtype {dtype}, "
+                         f"got {out.shape} and {out.dtype}")
+
+    if p != np.inf and min(n, m) < GRAM_MIN_ROWS:
+        return _subtracted_norms(X, Y, metric, out, max_block_bytes)
+
+    Yc = Y.tocsc()
+    Yc.sort_indices()
+    col_counts = np.diff(Yc.indptr)
+    if p == 2:
+        x_sq = row_norms(X)
+        y_sq = row_norms(Y) if y_norms is None else np.asarray(y_norms, dtype=np.float64)
+        Yt = Y.T.tocsr()
+    elif p == 1:
+        x_l1, y_l1 = row_norms(X, metric), row_norms(Y, metric)
+    else:
+        x_sorted, y_sorted, y_keys = _by_magnitude(X), _by_magnitude(Y), _row_keys(Y)
+
+    for start, stop in _row_blocks(X, col_counts, m, max_block_bytes):
+        block = out[start:stop]
+        if p == 2:
+            dot = (X[start:stop] @ Yt).toarray()
+            np.maximum(x_sq[start:stop, None] + y_sq[None, :] - 2 * dot, 0, out=dot)
+            np.sqrt(dot, out=block)
+            continue
+
+        x_rows, y_rows, x_values, y_values = _shared_entries(X, start, stop, Yc)
+        flat = x_rows * m + y_rows
+        if p == 1:
+            # |x - y| replaces |x| + |y| wherever both rows are non-zero
+            correction = np.abs(x_values - y_values) - np.abs(x_values) - np.abs(y_values)
+            shared = np.bincount(flat, weights=correction, minlength=block.size).reshape(block.shape)
+            block[...] = x_l1[start:stop, None] + y_l1[None, :] + shared
+        else:
+            shared = np.zeros(block.size)
+            np.maximum.at(shared, flat, np.abs(x_values - y_values))
+            d = X.shape[1]
+            x_only = _max_unshared(x_sorted, np.arange(start, stop), y_keys, m, d)
+            y_only = _max_unshared(y_sorted, np.arange(m), _row_keys(X[start:stop]), stop - start, d)
+            block[...] = np.maximum(np.maximum(shared.reshape(block.shape), x_only), y_only.T)
+    return out
@@ -0,0 +1,285 @@
+import json
+import os
+
+import numpy as np
+
+from .ingest import CSV_BLOCK_BYTES, _open_ipc, _require_pyarrow, file_format
+from .streaming_stats import RunningMoments, StreamingStatistics
+
+# RunningMoments moved to streaming_stats and is re-exported here so existing
+# imports from this module keep working
+__all__ = [
+    'DEFAULT_CHUNK_ROWS', 'RunningMoments', 'SCALERS', 'StreamingMinMaxScaler', 'StreamingQuantileScaler',
+    'StreamingRobustScaler', 'StreamingScaler', 'StreamingStandardScaler', 'iter_chunks', 'normalize_file',
+]
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def _record_batches(path, fmt, chunk_rows, columns):
+    # Arrow record batches of at most chunk_rows rows, read with the same
+    # readers (and memory mapping) as statcore.ingest
+    _require_pyarrow()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        yield from pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_rows, columns=columns)
+        return
+    if fmt == 'ipc':
+        table = _open_ipc(path)
+        batches = (table if columns is None else table.select(columns)).to_batches(max_chunksize=chunk_rows)
+    else:
+        import pyarrow.csv as csv
+
+        batches = csv.open_csv(path, read_options=csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+                               convert_options=csv.ConvertOptions(include_columns=columns))
+    for batch in batches:
+        for start in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(start, chunk_rows)
+
+
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None):
+    # Yields (column_names, float64 array) blocks of at most chunk_rows rows
+    # from any file statcore.ingest reads
+    fmt = file_format(path)
+    if fmt != 'npy':
+        for batch in _record_batches(path, fmt, chunk_rows, columns):
+            frame = batch.to_pandas()
+            yield list(frame.columns), frame.to_numpy(dtype=np.float64)
+    else:
+        array = np.load(path, mmap_mode='r')
+        if array.ndim == 1:
+            array = array[:, None]
+        names = [str(i) for i in range(array.shape[1])]
+        if columns is not None:
+            idx = [int(c) for c in columns]
+            names = [names[i] for i in idx]
+        for start in range(0, array.shape[0], chunk_rows):
+            block = array[start:start + chunk_rows]
+            if columns is not None:
+                block = block[:, idx]
+            yield names, np.asarray(block, dtype=np.float64)
+
+
+class StreamingScaler:
+    # Base for scalers fitted in one pass over chunks via StreamingStatistics.
+    # Subclasses set needs_quantiles and implement _transform. The fitted state
+    # (parameters plus mergeable statistics) serializes to JSON, so services can
+    # reload it and apply the identical transform without refitting.
+    needs_quantiles = False
+
+    def __init__(self, error=0.001, seed=None):
+        self.error = error
+        self.seed = seed
+        self.statistics = StreamingStatistics(self.needs_quantiles, error, seed)
+        self.columns = None
+
+    def get_params(self):
+        return {'error': self.error, 'seed': self.seed}
+
+    def partial_fit(self, chunk, columns=None):
+        if columns is not None and self.columns is None:
+            self.columns = list(columns)
+        self.statistics.update(chunk)
+        return self
+
+    def fit(self, source, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None):
+        # source is a CSV, Parquet, Arrow IPC or .npy path, or an in-memory 2-D array
+        self.statistics = StreamingStatistics(self.needs_quantiles, self.error, self.seed)
+        self.columns = None
+        if isinstance(source, (str, os.PathLike)):
+            for names, chunk in iter_chunks(source, chunk_rows, columns):
+                self.partial_fit(chunk, names)
+        else:
+            self.partial_fit(source, getattr(source, 'columns', None))
+        return self
+
+    def merge(self, other):
+        if type(other) is not type(self):
+            raise ValueError(f"Cannot merge {type(other).__name__} into {type(self).__name__}")
+        if self.columns is None:
+            self.columns = other.columns
+        self.statistics.merge(other.statistics)
+        return self
+
+    def transform(self, chunk):
+        if self.statistics.n == 0:
+            raise ValueError(f"{type(self).__name__} is not fitted yet")
+        return self._transform(np.asarray(chunk, dtype=np.float64))
+
+    def to_dict(self):
+        return {'type': type(self).__name__, 'params': self.get_params(), 'columns': self.columns,
+                'statistics': self.statistics.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        scaler_cls = SCALERS[state['type']]
+        if not issubclass(scaler_cls, cls):
+            raise ValueError(f"State describes a {state['type']}, not a {cls.__name__}")
+        scaler = scaler_cls(**state['params'])
+        scaler.columns = state['columns']
+        scaler.statistics = StreamingStatistics.from_dict(state['statistics'])
+        return scaler
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def transform_file(self, src, dst, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None):
+        # Writes the transformed rows of src to dst one chunk at a time
+        fmt = file_format(dst)
+        if fmt == 'npy':
+            total = np.load(src, mmap_mode='r').shape[0] if file_format(src) == 'npy' else None
+            if total is None:
+                total = sum(chunk.shape[0] for _, chunk in iter_chunks(src, chunk_rows, columns))
+            out = np.lib.format.open_memmap(dst, mode='w+', dtype=np.float64,
+                                            shape=(total, self.statistics.n_features))
+            row = 0
+            for _, chunk in iter_chunks(src, chunk_rows, columns):
+                out[row:row + chunk.shape[0]] = self.transform(chunk)
+                row += chunk.shape[0]
+            out.flush()
+            del out
+        elif fmt == 'csv':
+            import pandas as pd
+
+            header = True
+            for names, chunk in iter_chunks(src, chunk_rows, columns):
+                frame = pd.DataFrame(self.transform(chunk), columns=names)
+                frame.to_csv(dst, mode='w' if header else 'a', header=header, index=False)
+                header = False
+        else:
+            import pandas as pd
+
+            pa = _require_pyarrow()
+            if fmt == 'parquet':
+                import pyarrow.parquet as pq
+
+                open_writer = pq.ParquetWriter
+            else:
+                import pyarrow.ipc as ipc
+
+                open_writer = ipc.new_file
+            writer = None
+            try:
+                for names, chunk in iter_chunks(src, chunk_rows, columns):
+                    table = pa.Table.from_pandas(pd.DataFrame(self.transform(chunk), columns=names),
+                                                 preserve_index=False)
+                    if writer is None:
+                        writer = open_writer(dst, table.schema)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+        return dst
+
+
+class StreamingStandardScaler(StreamingScaler):
+    # Out-of-core equivalent of sklearn's StandardScaler (population std,
+    # zero-variance columns left unscaled)
+    @property
+    def mean_(self):
+        return self.statistics.moments.mean
+
+    @property
+    def scale_(self):
+        std = self.statistics.moments.std()
+        return np.where(std == 0, 1.0, std)
+
+    def _transform(self, chunk):
+        return (chunk - self.mean_) / self.scale_
+
+
+class StreamingMinMaxScaler(StreamingScaler):
+    # Maps each column's observed [min, max] onto feature_range; the extremes
+    # are tracked exactly
+    def __init__(self, feature_range=(0.0, 1.0), error=0.001, seed=None):
+        super().__init__(error, seed)
+        self.feature_range = tuple(feature_range)
+
+    def get_params(self):
+        return {'feature_range': list(self.feature_range), 'error': self.error, 'seed': self.seed}
+
+    def _transform(self, chunk):
+        low, high = self.feature_range
+        span = self.statistics.max - self.statistics.min
+        span = np.where(span == 0, 1.0, span)
+        return low + (chunk - self.statistics.min) / span * (high - low)
+
+
+class StreamingRobustScaler(StreamingScaler):
+    # Centres on the median and scales by the interquantile range, both read
+    # from the KLL sketches (rank error about `error`)
+    needs_quantiles = True
+
+    def __init__(self, quantile_range=(25.0, 75.0), error=0.001, seed=None):
+        super().__init__(error, seed)
+        self.quantile_range = tuple(quantile_range)
+
+    def get_params(self):
+        return {'quantile_range': list(self.quantile_range), 'error': self.error, 'seed': self.seed}
+
+    @property
+    def center_(self):
+        return self.statistics.quantile(0.5)
+
+    @property
+    def scale_(self):
+        low, high = self.statistics.quantile(np.asarray(self.quantile_range) / 100.0)
+        iqr = high - low
+        return np.where(iqr == 0, 1.0, iqr)
+
+    def _transform(self, chunk):
+        return (chunk - self.center_) / self.scale_
+
+
+class StreamingQuantileScaler(StreamingScaler):
+    # Maps each column through its sketched CDF onto a uniform or standard
+    # normal distribution, like sklearn's QuantileTransformer
+    needs_quantiles = True
+
+    def __init__(self, n_quantiles=1000, output_distribution='uniform', error=0.001, seed=None):
+        if output_distribution not in ('uniform', 'normal'):
+            raise ValueError(f"output_distribution must be 'uniform' or 'normal', got {output_distribution}")
+        super().__init__(error, seed)
+        self.n_quantiles = n_quantiles
+        self.output_distribution = output_distribution
+
+    def get_params(self):
+        return {'n_quantiles': self.n_quantiles, 'output_distribution': self.output_distribution,
+                'error': self.error, 'seed': self.seed}
+
+    def _transform(self, chunk):
+        references = np.linspace(0.0, 1.0, self.n_quantiles)
+        quantiles = self.statistics.quantile(references)
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        out = np.empty_like(chunk)
+        for j in range(chunk.shape[1]):
+            # Average the forward and backward interpolation so runs of equal
+            # quantiles map to the middle of their reference range
+            forward = np.interp(chunk[:, j], quantiles[:, j], references)
+            backward = -np.interp(-chunk[:, j], -quantiles[::-1, j], -references[::-1])
+            out[:, j] = 0.5 * (forward + backward)
+        if self.output_distribution == 'normal':
+            from scipy.stats import norm
+
+            clip = 1e-7
+            out = norm.ppf(np.clip(out, clip, 1 - clip))
+        return out
+
+
+SCALERS = {cls.__name__: cls for cls in (StreamingStandardScaler, StreamingMinMaxScaler,
+                                         StreamingRobustScaler, StreamingQuantileScaler)}
+
+
+def normalize_file(src, dst, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None, scaler=None):
+    # Two passes over src: fit (a StreamingStandardScaler unless one is given), then write
+    scaler = (scaler or StreamingStandardScaler()).fit(src, chunk_rows, columns)
+    scaler.transform_file(src, dst, chunk_rows, columns)
+    return scaler
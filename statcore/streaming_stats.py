@@ -0,0 +1,161 @@
+import numpy as np
+
+from .quantile_sketch import KLLSketch
+
+
+class RunningMoments:
+    # Per-column count, mean and sum of squared deviations (M2), merged with
+    # Chan et al.'s parallel update so shards can be fitted independently
+    def __init__(self, n_features=None):
+        self.n = 0
+        self.mean = None if n_features is None else np.zeros(n_features)
+        self.m2 = None if n_features is None else np.zeros(n_features)
+
+    @classmethod
+    def from_chunk(cls, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        moments = cls(chunk.shape[1])
+        moments.n = chunk.shape[0]
+        if moments.n:
+            moments.mean = chunk.mean(axis=0)
+            moments.m2 = ((chunk - moments.mean) ** 2).sum(axis=0)
+        return moments
+
+    def update(self, chunk):
+        return self.merge(RunningMoments.from_chunk(chunk))
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean.copy(), other.m2.copy()
+            return self
+        if self.mean.shape != other.mean.shape:
+            raise ValueError(f"Cannot merge statistics over {self.mean.shape[0]} and "
+                             f"{other.mean.shape[0]} columns")
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.n / n)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.n * other.n / n)
+        self.n = n
+        return self
+
+    def var(self, ddof=0):
+        if self.n - ddof <= 0:
+            raise ValueError(f"Need more than {ddof} observations, got {self.n}")
+        return self.m2 / (self.n - ddof)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.var(ddof))
+
+    def to_dict(self):
+        return {'n': self.n,
+                'mean': None if self.mean is None else self.mean.tolist(),
+                'm2': None if self.m2 is None else self.m2.tolist()}
+
+    @classmethod
+    def from_dict(cls, state):
+        moments = cls()
+        moments.n = int(state['n'])
+        moments.mean = None if state['mean'] is None else np.asarray(state['mean'], dtype=np.float64)
+        moments.m2 = None if state['m2'] is None else np.asarray(state['m2'], dtype=np.float64)
+        return moments
+
+
+class StreamingStatistics:
+    # One pass over chunks of a 2-D array: per-column moments, min and max and,
+    # when track_quantiles is set, a KLL sketch per column. Every piece is
+    # mergeable, so shards can be summarized by separate workers.
+    def __init__(self, track_quantiles=False, error=0.001, seed=None):
+        self.track_quantiles = track_quantiles
+        self.error = error
+        self.seed = seed
+        self.moments = RunningMoments()
+        self.min = None
+        self.max = None
+        self.sketches = None
+
+    @property
+    def n(self):
+        return self.moments.n
+
+    @property
+    def n_features(self):
+        return None if self.min is None else self.min.shape[0]
+
+    def _init_columns(self, n_features):
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        if self.track_quantiles:
+            seeds = np.random.SeedSequence(self.seed).spawn(n_features)
+            self.sketches = [KLLSketch(self.error, s) for s in seeds]
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim == 1:
+            chunk = chunk[:, None]
+        if chunk.shape[0] == 0:
+            return self
+        if self.min is None:
+            self._init_columns(chunk.shape[1])
+        elif chunk.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} columns, got {chunk.shape[1]}")
+        self.moments.update(chunk)
+        np.minimum(self.min, chunk.min(axis=0), out=self.min)
+        np.maximum(self.max, chunk.max(axis=0), out=self.max)
+        if self.track_quantiles:
+            for sketch, column in zip(self.sketches, chunk.T):
+                sketch.update(column)
+        return self
+
+    def merge(self, other):
+        if other.min is None:
+            return self
+        if self.min is None:
+            self._init_columns(other.n_features)
+        elif other.n_features != self.n_features:
+            raise ValueError(f"Cannot merge statistics over {self.n_features} and "
+                             f"{other.n_features} columns")
+        self.moments.merge(other.moments)
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        if self.track_quantiles:
+            if other.sketches is None:
+                raise ValueError("Cannot merge statistics without quantile sketches")
+            for sketch, other_sketch in zip(self.sketches, other.sketches):
+                sketch.merge(other_sketch)
+        return self
+
+    def quantile(self, q):
+        # Array of shape (len(q), n_features), or (n_features,) for scalar q
+        if not self.track_quantiles:
+            raise ValueError("Quantiles need StreamingStatistics(track_quantiles=True)")
+        return np.stack([sketch.quantile(q) for sketch in self.sketches], axis=-1)
+
+    def to_dict(self):
+        return {
+            'track_quantiles': self.track_quantiles,
+            'error': self.error,
+            'seed': self.seed,
+            'moments': self.moments.to_dict(),
+            'min': None if self.min is None else self.min.tolist(),
+            'max': None if self.max is None else self.max.tolist(),
+            'sketches': None if self.sketches is None else [s.to_dict() for s in self.sketches],
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        # Sketches get the same per-column seeds as a fresh fit, so a reloaded
+        # state compacts deterministically when updated or merged. States saved
+        # before the seed was stored load unseeded.
+        statistics = cls(state['track_quantiles'], state['error'], state.get('seed'))
+        statistics.moments = RunningMoments.from_dict(state['moments'])
+        if state['min'] is not None:
+            statistics.min = np.asarray(state['min'], dtype=np.float64)
+            statistics.max = np.asarray(state['max'], dtype=np.float64)
+        if state['sketches'] is not None:
+            seeds = np.random.SeedSequence(statistics.seed).spawn(len(state['sketches']))
+            statistics.sketches = [KLLSketch.from_dict(s, seed) for s, seed in zip(state['sketches'], seeds)]
+        return statistics
@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+
+from .batch_tests import t_test_from_moments, z_test_from_moments
+
+
+class SampleAccumulator:
+    # Running sufficient statistics (n, mean, M2) of a stream of observations.
+    # Single values use Welford's update, arrays are folded in with Chan's
+    # parallel merge, so memory stays O(1) however many values arrive.
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = int(n)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+
+    @classmethod
+    def from_sample(cls, sample):
+        return cls().update_many(sample)
+
+    def update(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        return self
+
+    def update_many(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size:
+            chunk_mean = values.mean()
+            chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+            self.merge(SampleAccumulator(values.size, chunk_mean, chunk_m2))
+        return self
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def as_tuple(self):
+        return self.n, self.mean, self.m2
+
+    def __repr__(self):
+        return f"SampleAccumulator(n={self.n}, mean={self.mean!r}, m2={self.m2!r})"
+
+
+def _moments(summary):
+    # Accepts an accumulator or an (n, mean, M2) tuple of scalars or arrays.
+    # An empty summary has no mean and fewer than two values no variance, so
+    # tests on them come out NaN rather than as a spurious p-value.
+    if isinstance(summary, SampleAccumulator):
+        summary = summary.as_tuple()
+    n, mean, m2 = (np.asarray(v, dtype=np.float64) for v in summary)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(n >= 1, mean, np.nan)
+        var = np.where(n >= 2, m2 / (n - 1), np.nan)
+    return n, mean, var
+
+
+def _scalar(statistic, pvalue):
+    if np.ndim(statistic) == 0:
+        return float(statistic), float(pvalue)
+    return statistic, pvalue
+
+
+def t_test_from_stats(summary1, summary2=None, equal_var=True, popmean=0.0, alternative='two-sided'):
+    moments2 = (None, None, None) if summary2 is None else _moments(summary2)
+    return _scalar(*t_test_from_moments(*_moments(summary1), *moments2, equal_var=equal_var,
+                                        popmean=popmean, alternative=alternative))
+
+
+def z_test_from_stats(summary1, summary2=None, usevar='pooled', value=0.0, alternative='two-sided'):
+    moments2 = (None, None, None) if summary2 is None else _moments(summary2)
+    return _scalar(*z_test_from_moments(*_moments(summary1), *moments2, usevar=usevar,
+                                        value=value, alternative=alternative))
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+stats = pytest.importorskip('scipy.stats')
+weightstats = pytest.importorskip('statsmodels.stats.weightstats')
+multitest = pytest.importorskip('statsmodels.stats.multitest')
+
+from statcore.batch_tests import adjust_pvalues, batch_moments, batch_t_test, batch_z_test
+from statcore.fast_pvalue import PVALUE_ABS_ERROR, T_REL_ERROR
+
+# statsmodels' names for the one-sided alternatives
+ZTEST_ALTERNATIVES = {'two-sided': 'two-sided', 'greater': 'larger', 'less': 'smaller'}
+
+
+def samples(rows=40, n1=30, n2=45, seed=0):
+    # Rows differ in location and scale, so p-values span the whole range
+    rng = np.random.default_rng(seed)
+    shift = rng.normal(0, 0.5, (rows, 1))
+    return rng.normal(0, 1, (rows, n1)), rng.normal(shift, rng.uniform(0.5, 3, (rows, 1)), (rows, n2))
+
+
+def ragged_masks(sample1, sample2, seed=1):
+    # At least three observations per row and group
+    rng = np.random.default_rng(seed)
+    mask1, mask2 = rng.random(sample1.shape) < 0.7, rng.random(sample2.shape) < 0.7
+    mask1[:, :3] = mask2[:, :3] = True
+    return mask1, mask2
+
+
+def assert_pvalues_close(approx, exact):
+    np.testing.assert_allclose(approx, exact, rtol=T_REL_ERROR, atol=PVALUE_ABS_ERROR)
+
+
+def test_batch_moments_ignore_nan():
+    x = np.array([[1.0, 2.0, np.nan, 4.0], [np.nan, np.nan, np.nan, 5.0]])
+    n, mean, var = batch_moments(x)
+    np.testing.assert_array_equal(n, [3, 1])
+    np.testing.assert_allclose(mean, [7 / 3, 5.0])
+    assert var[0] == pytest.approx(np.var([1.0, 2.0, 4.0], ddof=1))
+    assert np.isnan(var[1])
+
+
+@pytest.mark.parametrize('alternative', ['two-sided', 'greater', 'less'])
+@pytest.mark.parametrize('equal_var', [True, False])
+def test_batch_t_test_matches_ttest_ind(equal_var, alternative):
+    x, y = samples()
+    statistic, pvalue = batch_t_test(x, y, equal_var=equal_var, alternative=alternative)
+    exact = stats.ttest_ind(x, y, axis=1, equal_var=equal_var, alternative=alternative)
+    np.testing.assert_allclose(statistic, exact.statistic, rtol=1e-10)
+    assert_pvalues_close(pvalue, exact.pvalue)
+
+
+@pytest.mark.parametrize('equal_var', [True, False])
+def test_masked_batch_t_test_matches_rowwise_ttest_ind(equal_var):
+    x, y = samples()
+    mask1, mask2 = ragged_masks(x, y)
+    statistic, pvalue = batch_t_test(x, y, mask1, mask2, equal_var=equal_var)
+    for i in range(x.shape[0]):
+        exact = stats.ttest_ind(x[i][mask1[i]], y[i][mask2[i]], equal_var=equal_var)
+        assert statistic[i] == pytest.approx(exact.statistic, rel=1e-10)
+        assert_pvalues_close(pvalue[i], exact.pvalue)
+
+
+def test_nan_entries_act_as_a_mask():
+    x, y = samples()
+    mask1, mask2 = ragged_masks(x, y)
+    expected = batch_t_test(x, y, mask1, mask2)
+    actual = batch_t_test(np.where(mask1, x, np.nan), np.where(mask2, y, np.nan))
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_one_sample_batch_t_test_matches_ttest_1samp():
+    x, _ = samples()
+    statistic, pvalue = batch_t_test(x, popmean=0.2)
+    exact = stats.ttest_1samp(x, 0.2, axis=1)
+    np.testing.assert_allclose(statistic, exact.statistic, rtol=1e-10)
+    assert_pvalues_close(pvalue, exact.pvalue)
+
+
+@pytest.mark.parametrize('alternative', ['two-sided', 'greater', 'less'])
+@pytest.mark.parametrize('usevar', ['pooled', 'unequal'])
+def test_batch_z_test_matches_statsmodels_ztest(usevar, alternative):
+    x, y = samples()
+    mask1, mask2 = ragged_masks(x, y)
+    statistic, pvalue = batch_z_test(x, y, mask1, mask2, usevar=usevar, value=0.1, alternative=alternative)
+    for i in range(x.shape[0]):
+        exact = weightstats.ztest(x[i][mask1[i]], y[i][mask2[i]], value=0.1, usevar=usevar,
+                                  alternative=ZTEST_ALTERNATIVES[alternative])
+        assert statistic[i] == pytest.approx(exact[0], rel=1e-10)
+        assert_pvalues_close(pvalue[i], exact[1])
+
+
+def test_one_sample_batch_z_test_matches_statsmodels_ztest():
+    x, _ = samples()
+    statistic, pvalue = batch_z_test(x, value=-0.1)
+    for i in range(x.shape[0]):
+        exact = weightstats.ztest(x[i], value=-0.1)
+        assert statistic[i] == pytest.approx(exact[0], rel=1e-10)
+        assert_pvalues_close(pvalue[i], exact[1])
+
+
+def test_unknown_usevar_raises():
+    x, y = samples(rows=2)
+    with pytest.raises(ValueError):
+        batch_z_test(x, y, usevar='paired')
+
+
+@pytest.mark.parametrize('method', ['fdr_bh', 'bonferroni'])
+def test_adjust_pvalues_matches_multipletests(method):
+    rng = np.random.default_rng(2)
+    # Ties, small and large values, and repeated ones
+    pvalues = np.concatenate([rng.uniform(0, 0.01, 50), rng.uniform(0, 1, 200), [0.02, 0.02, 0.5, 1.0]])
+    reject, adjusted = adjust_pvalues(pvalues, method, alpha=0.05)
+    exact_reject, exact_adjusted, _, _ = multitest.multipletests(pvalues, alpha=0.05, method=method)
+    np.testing.assert_allclose(adjusted, exact_adjusted, rtol=1e-12)
+    np.testing.assert_array_equal(reject, exact_reject)
+
+
+def test_adjust_pvalues_skips_nan():
+    pvalues = np.array([0.01, np.nan, 0.04, 0.03, np.nan])
+    reject, adjusted = adjust_pvalues(pvalues)
+    _, exact, _, _ = multitest.multipletests(pvalues[[0, 2, 3]], method='fdr_bh')
+    np.testing.assert_allclose(adjusted[[0, 2, 3]], exact)
+    assert np.isnan(adjusted[[1, 4]]).all()
+    assert not reject[[1, 4]].any()
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+stats = pytest.importorskip('scipy.stats')
+
+from statcore.fast_kde import MAX_GRID_SIZE, BinnedKDE, make_kde
+
+# Error bound against gaussian_kde, relative to the peak density
+PEAK_REL_ERROR = 1e-3
+
+N = 100_000
+
+
+def sample(name, n=N):
+    rng = np.random.default_rng(0)
+    if name == 'normal':
+        return rng.normal(size=n)
+    if name == 'bimodal':
+        return np.concatenate([rng.normal(-3, 1, n // 2), rng.normal(4, 0.5, n - n // 2)])
+    if name == 'exponential':
+        return rng.exponential(size=n)
+    if name == 'lognormal':
+        return rng.lognormal(0, 2, n)
+    if name == 'cauchy':
+        return rng.standard_cauchy(n)
+    if name == 'outlier':
+        return np.r_[rng.normal(size=n - 1), 1e5]
+    raise ValueError(name)
+
+
+def evaluation_points(x, kde):
+    # The central 99.8% of the data, plus grid nodes and midpoints around the
+    # mode, where interpolation between nodes errs most
+    lo, hi = np.quantile(x, [1e-3, 1 - 1e-3])
+    mode = np.argmax(kde.density)
+    nodes = kde.grid[max(mode - 200, 0):mode + 200]
+    return np.concatenate([np.linspace(lo, hi, 1_000), nodes, (nodes[:-1] + nodes[1:]) / 2])
+
+
+@pytest.mark.parametrize('name', ['normal', 'bimodal', 'exponential', 'lognormal', 'cauchy', 'outlier'])
+def test_binned_kde_within_bound_of_gaussian_kde(name):
+    x = sample(name)
+    kde = BinnedKDE(x)
+    points = evaluation_points(x, kde)
+    exact = stats.gaussian_kde(x)(points)
+    assert np.max(np.abs(kde(points) - exact)) <= PEAK_REL_ERROR * exact.max()
+
+
+@pytest.mark.parametrize('bw_method', ['scott', 'silverman', 0.05])
+def test_bandwidth_matches_gaussian_kde(bw_method):
+    x = sample('lognormal', 60_000)
+    kde = make_kde(x, bw_method=bw_method)
+    assert isinstance(kde, BinnedKDE)
+    exact = stats.gaussian_kde(x, bw_method)
+    assert kde.bandwidth == pytest.approx(np.sqrt(exact.covariance[0, 0]), rel=1e-12)
+
+
+def test_too_wide_grid_falls_back_to_gaussian_kde():
+    # A single far outlier with a tiny bandwidth needs more than MAX_GRID_SIZE nodes
+    x = sample('outlier')
+    with pytest.raises(ValueError):
+        BinnedKDE(x, bw_method=1e-3)
+    kde = make_kde(x, bw_method=1e-3)
+    assert isinstance(kde, stats.gaussian_kde)
+    points = np.linspace(-3, 3, 7)
+    np.testing.assert_allclose(kde(points), stats.gaussian_kde(x, 1e-3)(points))
+    assert MAX_GRID_SIZE < 1e5 / (1e-3 * x.std(ddof=1)) * 32
+
+
+def test_small_samples_use_gaussian_kde():
+    x = sample('normal', 1_000)
+    assert isinstance(make_kde(x), stats.gaussian_kde)
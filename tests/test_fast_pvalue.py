@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+special = pytest.importorskip('scipy.special')
+
+from statcore import fast_pvalue
+from statcore.fast_pvalue import PVALUE_ABS_ERROR, T_ABS_ERROR, T_REL_ERROR, TABLE_MIN_SF, pvalue, t_cdf, t_sf
+
+# Integers where stdtr has closed forms, both ends of the table range, and
+# values between buckets
+DFS = np.concatenate([[1, 1.5, 2, 3, 7.3, 29, 30, 100, 1234.5, 1e5, 1e7, 1e8],
+                      np.random.default_rng(1).uniform(1, 200, 20)])
+
+
+def statistics(n=5_000):
+    # Dense in the centre, geometric out to well past the table range
+    rng = np.random.default_rng(0)
+    x = np.concatenate([np.linspace(-10, 10, n), np.geomspace(1e-6, 1e40, n), rng.standard_t(2, n)])
+    return np.concatenate([x, -x])
+
+
+def errors(approx, exact):
+    # Max absolute error, and max relative error on the tail side (exact at
+    # most 0.5), where the tables apply
+    covered = np.minimum(exact, 1 - exact) >= TABLE_MIN_SF
+    tail = covered & (exact <= 0.5)
+    relative = np.abs(approx[tail] - exact[tail]) / exact[tail]
+    return np.max(np.abs(approx[covered] - exact[covered])), np.max(relative)
+
+
+@pytest.mark.parametrize('df', DFS)
+def test_t_sf_and_cdf_within_bounds(df):
+    x = statistics()
+    for approx, exact in ((t_sf(x, df), special.stdtr(df, -x)), (t_cdf(x, df), special.stdtr(df, x))):
+        abs_err, rel_err = errors(approx, exact)
+        assert abs_err <= T_ABS_ERROR
+        assert rel_err <= T_REL_ERROR
+
+
+@pytest.mark.parametrize('df', DFS)
+def test_two_sided_pvalue_within_bounds(df):
+    x = statistics()
+    exact = 2 * special.stdtr(df, -np.abs(x))
+    approx = pvalue(x, df)
+    covered = exact >= 2 * TABLE_MIN_SF
+    error = np.abs(approx[covered] - exact[covered])
+    assert np.max(error) <= PVALUE_ABS_ERROR
+    assert np.max(error / exact[covered]) <= T_REL_ERROR
+
+
+@pytest.mark.parametrize('size', [100, 1_000, 10_000])
+def test_scalar_df_blends_agree_within_bounds(size):
+    # Small arrays blend only the rows they use, larger ones a whole table
+    x = np.random.default_rng(size).standard_t(3, size) * 3
+    abs_err, rel_err = errors(t_sf(x, 17.77), special.stdtr(17.77, -x))
+    assert abs_err <= T_ABS_ERROR
+    assert rel_err <= T_REL_ERROR
+
+
+def test_per_element_df_within_bounds():
+    rng = np.random.default_rng(2)
+    x = rng.choice(statistics(), 200_000)
+    df = np.exp(rng.uniform(0, np.log(1e7), x.size))
+    abs_err, rel_err = errors(t_sf(x, df), special.stdtr(df, -x))
+    assert abs_err <= T_ABS_ERROR
+    assert rel_err <= T_REL_ERROR
+
+
+def test_extreme_tails_are_exact():
+    for df in (1, 30, 1e4, 1e9):
+        x = -special.stdtrit(df, TABLE_MIN_SF / 10) * np.geomspace(1, 1e20, 200)
+        np.testing.assert_allclose(t_sf(x, df), special.stdtr(df, -x), rtol=1e-14, atol=0)
+
+
+def test_small_inputs_are_exact():
+    assert pvalue(1.3, 57.3) == 2 * special.stdtr(57.3, -1.3)
+    x = np.linspace(-4, 4, fast_pvalue.EXACT_MAX_SIZE)
+    np.testing.assert_array_equal(pvalue(x, 9.5), 2 * special.stdtr(9.5, -np.abs(x)))
+
+
+def test_ragged_df_builds_only_the_buckets_in_use():
+    fast_pvalue._t_table.cache_clear()
+    x = np.random.default_rng(3).normal(size=1_000) * 3
+    df = np.r_[np.full(999, 2.0), 1e7]
+    abs_err, _ = errors(t_sf(x, df), special.stdtr(df, -x))
+    assert abs_err <= T_ABS_ERROR
+    assert fast_pvalue._t_table.cache_info().currsize <= 8
+
+
+def test_one_sided_alternatives():
+    x = np.array([-2.5, 0.0, 1.7])
+    np.testing.assert_allclose(pvalue(x, 12, 'greater'), special.stdtr(12, -x), atol=T_ABS_ERROR)
+    np.testing.assert_allclose(pvalue(x, 12, 'less'), special.stdtr(12, x), atol=T_ABS_ERROR)
+    with pytest.raises(ValueError):
+        pvalue(x, 12, 'two_sided')
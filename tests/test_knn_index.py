@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+spatial = pytest.importorskip('scipy.spatial.distance')
+
+from statcore.knn_index import KNNIndex, brute_force_knn, recall_at_k
+
+METRICS = {'Euclidean': 'euclidean', 'Manhattan': 'cityblock', 'Chebyshev': 'chebyshev'}
+
+
+def data(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(2_000, 6)), rng.normal(size=(130, 6))
+
+
+@pytest.mark.parametrize('metric', METRICS)
+@pytest.mark.parametrize('max_block_bytes', [1, 2_000 * 16 * 7, 1 << 26])
+def test_brute_force_knn_matches_cdist(metric, max_block_bytes):
+    # One query per block, uneven blocks, and a single block
+    points, queries = data()
+    distances, indices = brute_force_knn(points, queries, 5, metric, max_block_bytes=max_block_bytes)
+    exact = spatial.cdist(queries, points, METRICS[metric])
+    np.testing.assert_allclose(distances, np.sort(exact, axis=1)[:, :5], rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(np.take_along_axis(exact, indices, axis=1), distances, rtol=1e-12, atol=1e-12)
+
+
+def test_brute_force_knn_caps_k_and_accepts_one_query():
+    points, queries = data()
+    distances, indices = brute_force_knn(points[:3], queries[0], k=10)
+    assert distances.shape == indices.shape == (1, 3)
+    assert np.all(np.diff(distances[0]) >= 0)
+
+
+def test_recall_of_exact_index_is_one():
+    pytest.importorskip('sklearn')
+    points, queries = data()
+    index = KNNIndex('Euclidean').build(points)
+    assert recall_at_k(index, queries, k=10) == 1.0
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from statcore.sequential import SequentialTest
+
+
+def run(effect, n_experiments=2_000, batches=100, batch=20, seed=0, **kwargs):
+    # Checks every experiment after each micro-batch, the peeking an mSPRT allows
+    rng = np.random.default_rng(seed)
+    test = SequentialTest(n_experiments, **kwargs)
+    for _ in range(batches):
+        test.update(rng.normal(effect, 1, (n_experiments, batch)), rng.normal(0, 1, (n_experiments, batch)))
+    return test
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('alpha', [0.05, 0.1])
+def test_null_false_stop_rate_within_alpha(alpha, seed):
+    test = run(0.0, alpha=alpha, seed=seed)
+    assert test.stopped.mean() <= alpha
+
+
+def test_real_effect_stops_early():
+    test = run(0.3, n_experiments=500, batches=50)
+    assert test.stopped.all()
+    assert np.median(test.stop_n) < 2 * 50 * 20
+    effect, pvalue = test.estimates()
+    assert np.all(pvalue < test.alpha)
+    assert abs(effect.mean() - 0.3) < 0.02
+
+
+def test_pvalue_never_increases():
+    rng = np.random.default_rng(3)
+    test = SequentialTest(100)
+    previous = test.pvalue.copy()
+    for _ in range(30):
+        test.update(rng.normal(0.1, 1, (100, 10)), rng.normal(0, 1, (100, 10)))
+        assert np.all(test.pvalue <= previous)
+        previous = test.pvalue.copy()
+
+
+def test_masked_and_indexed_updates_match_dense_ones():
+    rng = np.random.default_rng(4)
+    values1, values2 = rng.normal(0.5, 1, (6, 40)), rng.normal(0, 1, (6, 40))
+    mask1, mask2 = rng.random((6, 40)) < 0.6, rng.random((6, 40)) < 0.6
+
+    masked = SequentialTest(6, min_samples=2)
+    masked.update(values1, values2, mask1, mask2)
+    padded = SequentialTest(6, min_samples=2)
+    padded.update(np.where(mask1, values1, np.nan), np.where(mask2, values2, np.nan))
+    np.testing.assert_array_equal(masked.pvalue, padded.pvalue)
+
+    # The same rows fed one experiment at a time, in pieces
+    indexed = SequentialTest(6, min_samples=2)
+    for i in (3, 0, 5, 1, 4, 2):
+        for start in (0, 25):
+            indexed.update(values1[i:i + 1, start:start + 25], values2[i:i + 1, start:start + 25],
+                           mask1[i:i + 1, start:start + 25], mask2[i:i + 1, start:start + 25], index=i)
+    np.testing.assert_allclose(indexed.mean1, masked.mean1, rtol=1e-12)
+    np.testing.assert_allclose(indexed.m2_2, masked.m2_2, rtol=1e-10)
+    np.testing.assert_array_equal(indexed.n1, masked.n1)
+
+
+def test_no_stop_before_min_samples():
+    rng = np.random.default_rng(5)
+    test = SequentialTest(10, min_samples=50)
+    stopped = test.update(rng.normal(5, 1, (10, 49)), rng.normal(0, 1, (10, 49)))
+    assert not stopped.any()
+    assert np.all(test.pvalue == 1.0)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SequentialTest(alpha=1.5)
+    with pytest.raises(ValueError):
+        SequentialTest(tau=0)
+    with pytest.raises(ValueError):
+        SequentialTest(3).update(np.zeros((2, 5)), np.zeros((2, 5)))
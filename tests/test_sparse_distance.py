@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+sp = pytest.importorskip('scipy.sparse')
+spatial = pytest.importorskip('scipy.spatial.distance')
+
+from statcore.pairwise import GRAM_MIN_ROWS
+from statcore.sparse_distance import PAIR_BYTES, _row_blocks, as_csr, sparse_pairwise_distances
+
+METRICS = {'Euclidean': 'euclidean', 'Manhattan': 'cityblock', 'Chebyshev': 'chebyshev'}
+
+
+def random_csr(rows, cols, density, seed, empty_rows=()):
+    # Mixed-sign values, some all-zero rows, and rows sharing columns by chance
+    rng = np.random.default_rng(seed)
+    dense = np.where(rng.random((rows, cols)) < density, rng.normal(0, 3, (rows, cols)), 0.0)
+    dense[list(empty_rows)] = 0
+    return sp.csr_array(dense)
+
+
+def expected(X, Y, metric):
+    return spatial.cdist(X.toarray(), Y.toarray(), METRICS[metric])
+
+
+def assert_matches_cdist(actual, X, Y, metric):
+    exact = expected(X, Y, metric)
+    # The Gram expansion carries rounding relative to the row norms
+    atol = 1e-12 if metric != 'Euclidean' else 1e-7 * max(exact.max(initial=0.0), 1.0)
+    np.testing.assert_allclose(actual, exact, rtol=1e-12, atol=atol)
+
+
+SHAPES = [(1, 50), (7, 300), (300, 5), (40, 60), (GRAM_MIN_ROWS, GRAM_MIN_ROWS), (3, 0)]
+
+
+@pytest.mark.parametrize('metric', METRICS)
+@pytest.mark.parametrize('shape', SHAPES)
+def test_matches_cdist(metric, shape):
+    n, m = shape
+    X = random_csr(n, 200, 0.05, 0, empty_rows=range(0, n, 5))
+    Y = random_csr(m, 200, 0.05, 1, empty_rows=range(1, m, 7))
+    assert_matches_cdist(sparse_pairwise_distances(X, Y, metric), X, Y, metric)
+
+
+@pytest.mark.parametrize('metric', METRICS)
+@pytest.mark.parametrize('shape', [(5, 40), (40, 60)])
+def test_small_blocks_match_cdist(metric, shape):
+    # A budget of a few pairs forces many row blocks and Y blocks
+    X = random_csr(shape[0], 100, 0.2, 2, empty_rows=[1])
+    Y = random_csr(shape[1], 100, 0.2, 3, empty_rows=[0, 9])
+    actual = sparse_pairwise_distances(X, Y, metric, max_block_bytes=2_000)
+    assert_matches_cdist(actual, X, Y, metric)
+
+
+def test_row_blocks_cover_rows_within_budget():
+    X = random_csr(200, 100, 0.1, 4, empty_rows=[0, 50, 199])
+    Y = random_csr(60, 100, 0.1, 5)
+    col_counts = np.diff(Y.tocsc().indptr)
+    budget = 4_000
+    blocks = list(_row_blocks(X, col_counts, Y.shape[0], budget))
+    assert len(blocks) > 1
+    assert blocks[0][0] == 0 and blocks[-1][1] == X.shape[0]
+    assert all(stop == next_start for (_, stop), (next_start, _) in zip(blocks, blocks[1:]))
+    rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+    cost = np.bincount(rows, weights=col_counts[X.indices], minlength=X.shape[0]) + Y.shape[0]
+    for start, stop in blocks:
+        # Only a single row on its own may exceed the budget
+        assert stop - start == 1 or cost[start:stop].sum() <= budget // PAIR_BYTES
+
+
+@pytest.mark.parametrize('metric', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('delta', [1e-5, 1e-6])
+def test_few_rows_do_not_cancel(metric, delta):
+    # Large, nearly equal rows: the norm expansion would round the distance to 0
+    x = np.full(10_000, 100.0)
+    y = x.copy()
+    y[123] += delta
+    distance = sparse_pairwise_distances(sp.csr_array(x[None]), sp.csr_array(y[None]), metric)
+    assert distance[0, 0] == pytest.approx(delta, rel=1e-6)
+
+
+def test_dense_input_and_one_dimensional_rows():
+    X = random_csr(4, 30, 0.3, 6)
+    dense = X.toarray()
+    np.testing.assert_array_equal(as_csr(dense[0]).toarray(), dense[:1])
+    actual = sparse_pairwise_distances(dense, X, 'Manhattan')
+    assert_matches_cdist(actual, X, X, 'Manhattan')
+
+
+def test_precomputed_y_norms():
+    X = random_csr(30, 80, 0.1, 7)
+    Y = random_csr(50, 80, 0.1, 8)
+    y_norms = np.asarray(Y.multiply(Y).sum(axis=1)).ravel()
+    actual = sparse_pairwise_distances(X, Y, y_norms=y_norms)
+    assert_matches_cdist(actual, X, Y, 'Euclidean')
+
+
+def test_out_and_errors():
+    X = random_csr(20, 10, 0.3, 9)
+    out = np.empty((20, 20))
+    assert sparse_pairwise_distances(X, X, 'Chebyshev', out=out) is out
+    with pytest.raises(ValueError):
+        sparse_pairwise_distances(X, X, 'Cosine')
+    with pytest.raises(ValueError):
+        sparse_pairwise_distances(X, random_csr(3, 11, 0.3, 10))
+    with pytest.raises(ValueError):
+        sparse_pairwise_distances(X, X, out=np.empty((20, 19)))
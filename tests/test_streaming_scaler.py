@@ -0,0 +1,162 @@
+import json
+
+import numpy as np
+import pytest
+
+from statcore.quantile_sketch import KLLSketch
+from statcore.streaming_scaler import (SCALERS, StreamingMinMaxScaler, StreamingQuantileScaler,
+                                       StreamingRobustScaler, StreamingScaler, StreamingStandardScaler,
+                                       iter_chunks, normalize_file)
+
+# Rank error allowed relative to the sketch's nominal error; KLL's guarantee
+# holds with high probability, not always exactly
+RANK_ERROR_SLACK = 1.5
+
+
+def rank_error(sketch, data, q):
+    # Distance of q from the range of ranks the returned values occupy
+    data = np.sort(data)
+    values = sketch.quantile(q)
+    low = np.searchsorted(data, values, side='left') / data.size
+    high = np.searchsorted(data, values, side='right') / data.size
+    return np.max(np.maximum(0.0, np.maximum(low - q, q - high)))
+
+
+def sharded_sketch(data, error, seed, shards=8):
+    # Sketches fitted on interleaved pieces of data, merged into the first
+    sketches = [KLLSketch(error, s) for s in np.random.SeedSequence(seed).spawn(shards)]
+    for i, piece in enumerate(np.array_split(data, 8 * shards)):
+        sketches[i % shards].update(piece)
+    for other in sketches[1:]:
+        sketches[0].merge(other)
+    return sketches[0]
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('error', [0.01, 0.001])
+def test_kll_rank_error_under_merge(error, seed):
+    data = np.random.default_rng(seed).lognormal(0, 1, 200_000)
+    sketch = sharded_sketch(data, error, seed)
+    assert sketch.n == data.size
+    assert sketch.size < 4 * sketch.k
+    assert rank_error(sketch, data, np.linspace(0, 1, 201)) <= RANK_ERROR_SLACK * error
+
+
+def test_kll_extremes_are_exact_and_nan_ignored():
+    data = np.random.default_rng(3).normal(size=50_000)
+    sketch = KLLSketch(0.01, 0).update(np.r_[data, np.nan])
+    assert sketch.n == data.size
+    assert sketch.quantile(0.0) == data.min()
+    assert sketch.quantile(1.0) == data.max()
+
+
+def test_kll_round_trip_preserves_quantiles():
+    data = np.random.default_rng(4).exponential(size=20_000)
+    sketch = KLLSketch(0.01, 0).update(data)
+    restored = KLLSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    q = np.linspace(0, 1, 51)
+    np.testing.assert_array_equal(restored.quantile(q), sketch.quantile(q))
+
+
+def data(seed=5):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.normal(3, 2, 20_000), rng.lognormal(0, 1, 20_000), np.full(20_000, 7.0)])
+
+
+SCALER_PARAMS = [
+    (StreamingStandardScaler, {}),
+    (StreamingMinMaxScaler, {'feature_range': (-1.0, 1.0)}),
+    (StreamingRobustScaler, {'quantile_range': (10.0, 90.0), 'error': 0.005}),
+    (StreamingQuantileScaler, {'n_quantiles': 200, 'output_distribution': 'normal', 'error': 0.005}),
+]
+
+
+@pytest.mark.parametrize('scaler_cls, params', SCALER_PARAMS)
+def test_scaler_round_trip(scaler_cls, params):
+    pytest.importorskip('scipy.stats')
+    x = data()
+    scaler = scaler_cls(seed=0, **params)
+    for chunk in np.array_split(x, 7):
+        scaler.partial_fit(chunk, ['a', 'b', 'c'])
+    restored = StreamingScaler.from_dict(json.loads(json.dumps(scaler.to_dict())))
+    assert type(restored) is scaler_cls
+    assert restored.get_params() == scaler.get_params()
+    assert restored.columns == ['a', 'b', 'c']
+    np.testing.assert_array_equal(restored.transform(x), scaler.transform(x))
+
+
+def test_save_and_load(tmp_path):
+    x = data()
+    scaler = StreamingRobustScaler(seed=1).fit(x)
+    scaler.save(tmp_path / 'scaler.json')
+    restored = StreamingRobustScaler.load(tmp_path / 'scaler.json')
+    np.testing.assert_array_equal(restored.transform(x), scaler.transform(x))
+    with pytest.raises(ValueError):
+        StreamingStandardScaler.load(tmp_path / 'scaler.json')
+
+
+def test_every_scaler_is_registered():
+    assert set(SCALERS) == {cls.__name__ for cls, _ in SCALER_PARAMS}
+
+
+def test_standard_scaler_matches_in_memory_statistics():
+    x = data()
+    scaler = StreamingStandardScaler()
+    for chunk in np.array_split(x, 9):
+        scaler.partial_fit(chunk)
+    np.testing.assert_allclose(scaler.mean_, x.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(scaler.scale_, np.where(x.std(axis=0) == 0, 1.0, x.std(axis=0)), rtol=1e-10)
+
+
+def test_merged_shards_match_single_fit():
+    x = data()
+    halves = [StreamingMinMaxScaler(seed=0).fit(part) for part in np.array_split(x, 2)]
+    merged = halves[0].merge(halves[1])
+    np.testing.assert_allclose(merged.transform(x), StreamingMinMaxScaler().fit(x).transform(x))
+    with pytest.raises(ValueError):
+        merged.merge(StreamingStandardScaler().fit(x))
+
+
+@pytest.mark.parametrize('src_ext', ['.csv', '.parquet', '.arrow', '.npy'])
+@pytest.mark.parametrize('dst_ext', ['.csv', '.parquet', '.arrow', '.npy'])
+def test_normalize_file_across_formats(tmp_path, src_ext, dst_ext):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('pyarrow')
+    x = data()
+    src, dst = tmp_path / f'src{src_ext}', tmp_path / f'dst{dst_ext}'
+    frame = pd.DataFrame(x, columns=['a', 'b', 'c'])
+    if src_ext == '.csv':
+        frame.to_csv(src, index=False)
+    elif src_ext == '.parquet':
+        frame.to_parquet(src)
+    elif src_ext == '.arrow':
+        frame.to_feather(src)
+    else:
+        np.save(src, x)
+    scaler = normalize_file(src, dst, chunk_rows=6_000)
+    chunks = [chunk for _, chunk in iter_chunks(dst, chunk_rows=6_000)]
+    assert max(chunk.shape[0] for chunk in chunks) <= 6_000
+    np.testing.assert_allclose(np.vstack(chunks), StreamingStandardScaler().fit(x).transform(x), atol=1e-12)
+    assert scaler.statistics.n == x.shape[0]
+
+
+@pytest.mark.parametrize('scaler_cls', [StreamingRobustScaler, StreamingQuantileScaler])
+def test_reloaded_state_keeps_its_seed(scaler_cls):
+    # Updating or merging a reloaded state must compact the sketches the same
+    # way every time
+    x = data()
+    state = json.loads(json.dumps(scaler_cls(seed=3, error=0.01).fit(x).to_dict()))
+    assert state['params']['seed'] == 3 and state['statistics']['seed'] == 3
+    refits = []
+    for _ in range(2):
+        scaler = StreamingScaler.from_dict(state)
+        scaler.partial_fit(data(seed=6)).merge(scaler_cls(seed=4, error=0.01).fit(data(seed=7)))
+        refits.append(scaler.transform(x))
+    np.testing.assert_array_equal(refits[0], refits[1])
+
+
+def test_state_without_seed_still_loads():
+    state = StreamingRobustScaler(seed=1).fit(data()).to_dict()
+    del state['params']['seed'], state['statistics']['seed']
+    restored = StreamingScaler.from_dict(state)
+    assert restored.seed is None and restored.statistics.seed is None
@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+import pytest
+
+pytest.importorskip('scipy.special')
+
+from statcore.batch_tests import batch_t_test, batch_z_test
+from statcore.sufficient_stats import SampleAccumulator, t_test_from_stats, z_test_from_stats
+
+
+def streamed(values, chunk=37):
+    # Mixes single-value updates with chunked ones, in uneven pieces
+    accumulator = SampleAccumulator()
+    for x in values[:5]:
+        accumulator.update(x)
+    for start in range(5, values.size, chunk):
+        accumulator.update_many(values[start:start + chunk])
+    return accumulator
+
+
+def samples(seed=0):
+    rng = np.random.default_rng(seed)
+    # A large offset makes naive sum-of-squares accumulation lose the variance
+    return rng.normal(1e6, 1.0, 1_000), rng.normal(1e6 + 0.1, 2.0, 1_500)
+
+
+def test_accumulator_matches_numpy():
+    x, _ = samples()
+    accumulator = streamed(x)
+    assert accumulator.n == x.size
+    assert accumulator.mean == pytest.approx(x.mean(), rel=1e-15)
+    assert accumulator.variance == pytest.approx(x.var(ddof=1), rel=1e-9)
+
+
+def test_merge_equals_single_stream():
+    x, y = samples()
+    merged = streamed(x).merge(streamed(y))
+    single = streamed(np.concatenate([x, y]))
+    assert merged.n == single.n
+    assert merged.mean == pytest.approx(single.mean, rel=1e-15)
+    assert merged.variance == pytest.approx(single.variance, rel=1e-9)
+
+
+@pytest.mark.parametrize('equal_var', [True, False])
+@pytest.mark.parametrize('alternative', ['two-sided', 'greater', 'less'])
+def test_t_test_from_streamed_stats_matches_batch(equal_var, alternative):
+    x, y = samples()
+    statistic, pvalue = t_test_from_stats(streamed(x), streamed(y), equal_var=equal_var,
+                                          alternative=alternative)
+    expected = batch_t_test(x, y, equal_var=equal_var, alternative=alternative)
+    assert isinstance(statistic, float) and isinstance(pvalue, float)
+    assert statistic == pytest.approx(expected[0][0], rel=1e-8)
+    assert pvalue == pytest.approx(expected[1][0], rel=1e-6, abs=1e-12)
+
+
+@pytest.mark.parametrize('usevar', ['pooled', 'unequal'])
+def test_z_test_from_streamed_stats_matches_batch(usevar):
+    x, y = samples()
+    statistic, pvalue = z_test_from_stats(streamed(x), streamed(y), usevar=usevar)
+    expected = batch_z_test(x, y, usevar=usevar)
+    assert statistic == pytest.approx(expected[0][0], rel=1e-8)
+    assert pvalue == pytest.approx(expected[1][0], rel=1e-6, abs=1e-12)
+
+
+def test_one_sample_and_tuple_summaries():
+    x, _ = samples()
+    accumulator = streamed(x)
+    expected = batch_t_test(x, popmean=1e6)
+    for summary in (accumulator, accumulator.as_tuple()):
+        statistic, pvalue = t_test_from_stats(summary, popmean=1e6)
+        assert statistic == pytest.approx(expected[0][0], rel=1e-8)
+        assert pvalue == pytest.approx(expected[1][0], rel=1e-6)
+
+
+def test_array_summaries_test_every_row():
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(0, 1, (4, 50)), rng.normal(0.5, 1, (4, 60))
+    summaries = [tuple(np.array(v) for v in zip(*(SampleAccumulator.from_sample(row).as_tuple() for row in s)))
+                 for s in (x, y)]
+    statistic, pvalue = t_test_from_stats(*summaries)
+    expected = batch_t_test(x, y)
+    np.testing.assert_allclose(statistic, expected[0], rtol=1e-10)
+    np.testing.assert_allclose(pvalue, expected[1], rtol=1e-10)
+
+
+@pytest.mark.parametrize('test', [t_test_from_stats, z_test_from_stats])
+@pytest.mark.parametrize('sizes', [(0, 10), (10, 0), (0, 0), (1, 1)])
+def test_empty_or_single_value_summaries_give_nan(test, sizes):
+    rng = np.random.default_rng(2)
+    summaries = [SampleAccumulator.from_sample(rng.normal(size=n)) for n in sizes]
+    statistic, pvalue = test(*summaries)
+    assert math.isnan(statistic) and math.isnan(pvalue)
+
+
+def test_empty_one_sample_summary_gives_nan():
+    statistic, pvalue = t_test_from_stats(SampleAccumulator())
+    assert math.isnan(statistic) and math.isnan(pvalue)